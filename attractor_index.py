@@ -0,0 +1,75 @@
+import numpy as np
+
+import bipolar
+
+# Kinds of attractor in an AttractorIndex
+EXEMPLAR = 'exemplar'
+SPURIOUS = 'spurious'
+
+
+class AttractorIndex(object):
+    """
+    Hash index of the known fixed points of a network: the stored exemplars which are stable, and the spurious
+    states recall has converged to.  States are keyed by their bit-packed form, so looking one up costs O(n)
+    regardless of the number of attractors.  Each attractor is labelled (EXEMPLAR, index of the exemplar) or
+    (SPURIOUS, index in the order the spurious states were found).
+    """
+
+    def __init__(self):
+        self.__labels = {}
+        self.__spurious = []
+
+    def __len__(self):
+        return len(self.__labels)
+
+    @staticmethod
+    def key(state):
+        """
+        :param state: bipolar state vector
+        :return: the key of the state in the index
+        """
+        return bipolar.pack(state).tobytes()
+
+    def get(self, state):
+        """
+        :param state: bipolar state vector
+        :return: the label of the state, or None if it is not a known attractor
+        """
+        return self.__labels.get(self.key(state))
+
+    def add_exemplars(self, exemplars, stable):
+        """
+        Index the stable exemplars of a network.  An exemplar stored more than once keeps the label of its first copy.
+        :param exemplars: (k, n) array of the stored exemplars
+        :param stable: (k,) boolean array of which exemplars are fixed points
+        """
+        for index in np.flatnonzero(stable):
+            self.__labels.setdefault(self.key(exemplars[index]), (EXEMPLAR, int(index)))
+
+    def add_spurious(self, state):
+        """
+        Index a fixed point which is not a stored exemplar
+        :param state: bipolar state vector
+        :return: the label of the state
+        """
+        key = self.key(state)
+        label = self.__labels.get(key)
+        if label is None:
+            label = (SPURIOUS, len(self.__spurious))
+            self.__labels[key] = label
+            self.__spurious.append(np.array(state, dtype=np.int8))
+        return label
+
+    @property
+    def spurious(self):
+        """
+        :return: (m, n) int8 array of the spurious attractors found, in the order of their labels
+        """
+        return np.array(self.__spurious, dtype=np.int8, ndmin=2)
+
+    def clear(self):
+        """
+        Forget every attractor
+        """
+        self.__labels.clear()
+        self.__spurious = []
@@ -0,0 +1,334 @@
+"""
+Benchmarks of the training and recall hot paths.  Each benchmark case is timed in a fresh worker process.  The
+memory reported for a case is the peak growth of resident memory while its work runs, above the memory held once
+its exemplars, probes and network are set up.
+
+    python benchmarks.py --output results.json
+    python benchmarks.py --quick --compare results.json
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import timeit
+
+import numpy as np
+
+from capacity_sweep import run_capacity_sweep
+from exemplars import Exemplars
+from hopfield_network import HopfieldNetwork, DENSE, FLOAT32, SCALED, PACKED
+from noise import add_noise_batch
+from random_exemplars import RandomExemplars
+
+# Default fraction by which a benchmark must be slower than its baseline to be reported as a regression
+DEFAULT_THRESHOLD = .1
+
+# Minimum duration of each timing of a case in seconds, reached by timing repeated runs together
+MIN_TIME = .05
+
+# Number of neurons of the cases which vary the number of exemplars
+K_SWEEP_NEURONS = 400
+
+
+def _exemplars_and_probes(params):
+    """
+    Random exemplars, and probes made from them with 10% noise, for a benchmark case
+    """
+    n, k = params['n'], params['k']
+    exemplars = RandomExemplars.generate(n, k, random_state=0)
+    random_state = np.random.RandomState(1)
+    batch = params.get('batch', 1)
+    flips = random_state.random_sample((batch, n)) < .1
+    probes = np.where(flips, -exemplars[np.arange(batch) % k], exemplars[np.arange(batch) % k])
+    return exemplars, probes
+
+
+def _train(params):
+    exemplars, _ = _exemplars_and_probes(params)
+
+    def run():
+        HopfieldNetwork(exemplars, learning_rule=params['rule'], storage=params['storage'])
+    return run, params['k'], 'exemplars'
+
+
+def _synchronous_recall(params):
+    exemplars, probes = _exemplars_and_probes(params)
+    network = HopfieldNetwork(exemplars, storage=params['storage'])
+
+    def run():
+        for probe in probes:
+            network.synchronous_recall(probe)
+    return run, len(probes), 'probes'
+
+
+def _synchronous_recall_batch(params):
+    exemplars, probes = _exemplars_and_probes(params)
+    network = HopfieldNetwork(exemplars, storage=params['storage'])
+
+    def run():
+        network.synchronous_recall_batch(probes)
+    return run, len(probes), 'probes'
+
+
+def _asynchronous_recall(params):
+    exemplars, probes = _exemplars_and_probes(params)
+    network = HopfieldNetwork(exemplars, storage=params['storage'])
+
+    def run():
+        for probe in probes:
+            network.asynchronous_recall(probe)
+    return run, len(probes), 'probes'
+
+
+def _asynchronous_recall_batch(params):
+    exemplars, probes = _exemplars_and_probes(params)
+    network = HopfieldNetwork(exemplars, storage=params['storage'])
+
+    def run():
+        network.asynchronous_recall_batch(probes)
+    return run, len(probes), 'probes'
+
+
+def _add_noise(params):
+    exemplar = Exemplars.get_exemplars()[0]
+
+    def run():
+        for _ in range(params['batch']):
+            Exemplars.add_noise(exemplar)
+    return run, params['batch'], 'probes'
+
+
+def _add_noise_batch(params):
+    exemplar = Exemplars.get_exemplars()[0]
+
+    def run():
+        add_noise_batch(exemplar, count=params['batch'], random_state=0)
+    return run, params['batch'], 'probes'
+
+
+def _capacity_sweep(params):
+    def run():
+        run_capacity_sweep(sizes=range(5, params['n'] + 1), num_trials=params['trials'], processes=1)
+    return run, 1, 'sweeps'
+
+
+# Benchmark name => function taking the case parameters and returning (run, count, unit), where run performs count
+# units of work
+BENCHMARKS = {
+    'train': _train,
+    'synchronous_recall': _synchronous_recall,
+    'synchronous_recall_batch': _synchronous_recall_batch,
+    'asynchronous_recall': _asynchronous_recall,
+    'asynchronous_recall_batch': _asynchronous_recall_batch,
+    'add_noise': _add_noise,
+    'add_noise_batch': _add_noise_batch,
+    'capacity_sweep': _capacity_sweep
+}
+
+
+def benchmark_cases(quick=False):
+    """
+    The benchmark cases, varying the number of neurons n with k = n / 10 exemplars, the batch size and the storage of
+    the weights, and separately the number of exemplars k at a fixed n
+    :param quick: only the smallest cases
+    :return: list of (name, params) cases
+    """
+    sizes = [100] if quick else [100, 400, 1000]
+    batches = [16] if quick else [16, 256]
+    storages = [DENSE] if quick else [DENSE, FLOAT32, SCALED, PACKED]
+
+    cases = []
+    for n in sizes:
+        k = max(1, n // 10)
+        for rule in ['Hebb', 'Storkey']:
+            cases.append(('train', {'n': n, 'k': k, 'rule': rule, 'storage': DENSE}))
+        for storage in storages:
+            if storage != DENSE:
+                cases.append(('train', {'n': n, 'k': k, 'rule': 'Hebb', 'storage': storage}))
+            for batch in batches:
+                for name in ['synchronous_recall', 'synchronous_recall_batch', 'asynchronous_recall',
+                             'asynchronous_recall_batch']:
+                    cases.append((name, {'n': n, 'k': k, 'batch': batch, 'storage': storage}))
+
+    # Vary k at a fixed n, with k = n / 10 already among the cases above
+    if not quick:
+        n = K_SWEEP_NEURONS
+        for k in [n // 20, n // 5]:
+            for rule in ['Hebb', 'Storkey']:
+                cases.append(('train', {'n': n, 'k': k, 'rule': rule, 'storage': DENSE}))
+            for batch in batches:
+                for name in ['synchronous_recall', 'synchronous_recall_batch', 'asynchronous_recall',
+                             'asynchronous_recall_batch']:
+                    cases.append((name, {'n': n, 'k': k, 'batch': batch, 'storage': DENSE}))
+
+    for batch in batches:
+        cases.append(('add_noise', {'n': 100, 'batch': batch}))
+        cases.append(('add_noise_batch', {'n': 100, 'batch': batch}))
+    cases.append(('capacity_sweep', {'n': 8 if quick else 12, 'trials': 2}))
+    return cases
+
+
+def _reset_peak_memory():
+    """
+    Reset the peak resident memory of this process to its current resident memory, which Linux allows through
+    /proc/self/clear_refs
+    :return: whether the peak was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except IOError:
+        return False
+
+
+def _memory_kb(field):
+    """
+    :param field: VmRSS for the current or VmHWM for the peak resident memory of this process
+    :return: the memory in kB
+    """
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    raise IOError("{0} is not reported".format(field))
+
+
+def _measure_memory(run):
+    """
+    Call run and measure the peak growth of resident memory while it runs.  Where the peak cannot be reset, which
+    includes any high-water mark inherited from a forked parent, only growth beyond that mark is seen.
+    :param run: function to call
+    :return: the peak growth in kB
+    """
+    gc.collect()
+    try:
+        if not _reset_peak_memory():
+            raise IOError("The peak resident memory cannot be reset")
+        baseline = _memory_kb('VmRSS')
+        run()
+        return max(0, _memory_kb('VmHWM') - baseline)
+    except IOError:
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        run()
+        return max(0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline)
+
+
+def run_case(case, repeat=3):
+    """
+    Time a benchmark case
+    :param case: (name, params) case
+    :param repeat: number of timings, of which the fastest is reported
+    :return: dict of the name and params of the case, the seconds taken by the fastest run, its throughput in units
+    and neurons per second, and the peak growth of resident memory during a run in kB
+    """
+    name, params = case
+    run, count, unit = BENCHMARKS[name](params)
+    memory_kb = _measure_memory(run)
+
+    # Time enough runs together that timer resolution and noise do not dominate fast cases
+    number = 1
+    while timeit.timeit(run, number=number) < MIN_TIME and number < 1 << 20:
+        number *= 2
+    seconds = min(timeit.repeat(run, repeat=repeat, number=number)) / number
+    result = {
+        'name': name,
+        'params': params,
+        'seconds': seconds,
+        'unit': unit,
+        'throughput': count / seconds,
+        'peak_memory_kb': memory_kb
+    }
+    if 'n' in params and unit == 'probes':
+        result['neurons_per_second'] = count * params['n'] / seconds
+    return result
+
+
+def _run_case(args):
+    return run_case(*args)
+
+
+def run_benchmarks(cases=None, repeat=3):
+    """
+    Time benchmark cases, each in a fresh worker process
+    :param cases: list of (name, params) cases.  Default is all of benchmark_cases().
+    :param repeat: number of timings of each case
+    :return: dict of the platform the benchmarks ran on and the list of results of run_case
+    """
+    if cases is None:
+        cases = benchmark_cases()
+
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        results = [pool.apply(_run_case, ((case, repeat),)) for case in cases]
+    finally:
+        pool.close()
+        pool.join()
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results
+    }
+
+
+def _case_key(result):
+    return result['name'], json.dumps(result['params'], sort_keys=True)
+
+
+def compare(benchmarks, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Find the benchmark cases which are slower than in a baseline
+    :param benchmarks: benchmarks from run_benchmarks
+    :param baseline: earlier benchmarks from run_benchmarks
+    :param threshold: fraction by which a case must be slower than its baseline to be reported
+    :return: list of (name, params, seconds, baseline seconds) of the slower cases.  Cases missing from the baseline
+    are ignored.
+    """
+    baseline_seconds = dict((_case_key(result), result['seconds']) for result in baseline['results'])
+    regressions = []
+    for result in benchmarks['results']:
+        seconds = baseline_seconds.get(_case_key(result))
+        if seconds is not None and result['seconds'] > seconds * (1 + threshold):
+            regressions.append((result['name'], result['params'], result['seconds'], seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark training and recall of Hopfield networks")
+    parser.add_argument('--quick', action='store_true', help="only run the smallest cases")
+    parser.add_argument('--repeat', type=int, default=3, help="timings of each case")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', metavar='BASELINE', help="report cases slower than in this JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="fraction by which a case must be slower than the baseline to be reported")
+    args = parser.parse_args(argv)
+
+    benchmarks = run_benchmarks(benchmark_cases(quick=args.quick), repeat=args.repeat)
+    for result in benchmarks['results']:
+        print "{0:<26} {1:<60} {2:>10.5f}s {3:>12.1f} {4}/s {5:>8} kB".format(
+            result['name'], json.dumps(result['params'], sort_keys=True), result['seconds'], result['throughput'],
+            result['unit'], result['peak_memory_kb'])
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(benchmarks, output_file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(benchmarks, baseline, args.threshold)
+        for name, params, seconds, baseline_seconds in regressions:
+            print "SLOWER {0} {1}: {2:.5f}s vs {3:.5f}s ({4:+.0%})".format(
+                name, json.dumps(params, sort_keys=True), seconds, baseline_seconds, seconds / baseline_seconds - 1)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
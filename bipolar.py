@@ -0,0 +1,74 @@
+import numpy as np
+
+# Number of set bits in each possible byte value
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def num_words(n):
+    """
+    Number of 64 bit words needed to store a bipolar vector of n elements
+    :param n: number of elements
+    :return: number of uint64 words
+    """
+    return (n + 63) // 64
+
+
+def pack(states):
+    """
+    Pack bipolar vectors into one bit per element (1 => set bit, -1 => clear bit), stored in uint64 words.  The
+    unused bits of the last word are clear.
+    :param states: a bipolar vector, or (b, n) array / list of b bipolar vectors
+    :return: (b, num_words(n)) uint64 array, with b = 1 for a single vector
+    """
+    bits = np.array(states, ndmin=2) > 0
+    b, n = bits.shape
+    packed = np.zeros((b, num_words(n) * 8), dtype=np.uint8)
+    packed[:, :(n + 7) // 8] = np.packbits(bits, axis=1)
+    return packed.view(np.uint64)
+
+
+def unpack(packed, n):
+    """
+    Unpack bit-packed vectors back to their bipolar form
+    :param packed: (b, num_words(n)) uint64 array from pack
+    :param n: number of elements in each vector
+    :return: (b, n) int8 array of 1s and -1s.  Use .tolist() for the list of vectors form.
+    """
+    packed = np.array(packed, dtype=np.uint64, ndmin=2)
+    bits = np.unpackbits(packed.view(np.uint8), axis=1)[:, :n].astype(np.int8)
+    return 2 * bits - 1
+
+
+def popcount(words):
+    """
+    Count the set bits in each row of packed words
+    :param words: (..., w) uint64 array
+    :return: (...) array of bit counts
+    """
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    counts = _POPCOUNT_TABLE[words.view(np.uint8)]
+    return counts.reshape(words.shape[:-1] + (-1,)).sum(axis=-1, dtype=np.int64)
+
+
+def hamming(packed_a, packed_b):
+    """
+    Hamming distances between every pair of packed vectors from two sets
+    :param packed_a: (a, w) uint64 array
+    :param packed_b: (b, w) uint64 array
+    :return: (a, b) array of the number of elements at which each pair differs
+    """
+    packed_a = np.array(packed_a, dtype=np.uint64, ndmin=2)
+    packed_b = np.array(packed_b, dtype=np.uint64, ndmin=2)
+    return popcount(np.bitwise_xor(packed_a[:, np.newaxis, :], packed_b[np.newaxis, :, :]))
+
+
+def overlaps(packed_a, packed_b, n):
+    """
+    Overlaps m = sum_i a_i b_i between every pair of packed bipolar vectors from two sets, computed as the number
+    of agreeing elements (XNOR) less the number of disagreeing ones
+    :param packed_a: (a, w) uint64 array
+    :param packed_b: (b, w) uint64 array
+    :param n: number of elements in each vector
+    :return: (a, b) array of overlaps
+    """
+    return n - 2 * hamming(packed_a, packed_b)
@@ -0,0 +1,145 @@
+import multiprocessing
+import numpy as np
+
+from hopfield_network import HopfieldNetwork
+from random_exemplars import RandomExemplars
+
+# Key under which the results of each learning rule are stored
+RESULT_KEYS = {
+    'Hebb': 'hebbian',
+    'Storkey': 'storkey'
+}
+
+
+def task_seed(seed, n, k, trial):
+    """
+    Seed of the random state for a single trial.  The seed depends only on the sweep seed and the trial, not on the
+    process which runs it or the order in which trials complete, so a sweep is reproducible for any pool size.  Every
+    learning rule is trained on the same exemplars within a trial.
+    :param seed: seed of the sweep
+    :param n: number of neurons
+    :param k: number of exemplars
+    :param trial: index of the trial
+    :return: seed for a numpy RandomState
+    """
+    return [seed, n, k, trial]
+
+
+def run_trial(task):
+    """
+    Train a network on k random exemplars of length n and count the exemplars which are not stable, which are
+    those that recall from themselves would change
+    :param task: tuple of (n, k, trial, learning_rule, seed)
+    :return: tuple of (n, k, trial, learning_rule, error rate, network capacity)
+    """
+    n, k, trial, learning_rule, seed = task
+    exemplars = RandomExemplars.generate(n, k, np.random.RandomState(task_seed(seed, n, k, trial)))
+    network = HopfieldNetwork(list(exemplars), learning_rule=learning_rule)
+
+    stable, _, _ = network.stable_patterns(exemplars)
+    errors = k - np.count_nonzero(stable)
+
+    return n, k, trial, learning_rule, (1.0 * errors) / k, network.capacity
+
+
+def outcome_record(outcome):
+    """
+    :param outcome: tuple of (n, k, trial, learning_rule, error rate, network capacity) from run_trial
+    :return: the outcome as a record for a ResultsStore
+    """
+    n, k, trial, learning_rule, rate, capacity = outcome
+    return {
+        'n': n,
+        'k': k,
+        'trial': trial,
+        'learning_rule': learning_rule,
+        'error_rate': rate,
+        'capacity': capacity
+    }
+
+
+def run_tasks(tasks, processes=None, chunk_size=1):
+    """
+    Run trials, yielding each outcome as it completes
+    :param tasks: list of tasks for run_trial
+    :param processes: number of worker processes.  None uses one per CPU, 1 runs the trials in this process.
+    :param chunk_size: number of trials handed to a worker at once
+    :return: generator of run_trial outcomes, in no particular order
+    """
+    if processes == 1:
+        for task in tasks:
+            yield run_trial(task)
+        return
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        for outcome in pool.imap_unordered(run_trial, tasks, chunk_size):
+            yield outcome
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def run_capacity_sweep(sizes=range(5, 21), num_trials=20, learning_rules=('Hebb', 'Storkey'), seed=0,
+                       processes=None, chunk_size=1, store=None):
+    """
+    Measure the recall error rate of networks trained up to and beyond their capacity.  For each network size n and
+    each number of exemplars k in [1, n), num_trials trials each generate k unique random exemplars, train a network
+    on them with every learning rule and record the fraction of exemplars which are not recalled from themselves.
+    The trials are run in a process pool.
+    :param sizes: network sizes n to sweep
+    :param num_trials: number of trials for each n and k
+    :param learning_rules: learning rules to train networks with
+    :param seed: seed of the sweep.  Each trial derives its own seed from it, so the results do not depend on the
+    number of processes.
+    :param processes: number of worker processes.  None uses one per CPU, 1 runs the trials in this process.
+    :param chunk_size: number of trials handed to a worker at once
+    :param store: optional ResultsStore.  The outcome of each trial is added to the store as it completes, and trials
+    which already have a record in the store are not run again, so an interrupted sweep can be resumed.
+    :return: tuple of (results, capacities) where results[n] is a list, ordered by k, of dicts holding k and the mean
+    error rate under each learning rule (keyed 'hebbian' and 'storkey'), and capacities[n] holds the capacity of the
+    network under each learning rule
+    """
+    tasks = [(n, k, trial, learning_rule, seed)
+             for n in sizes
+             for k in range(1, n)
+             for trial in range(num_trials)
+             for learning_rule in learning_rules]
+
+    # A task is the key of its record in the store
+    outcomes = []
+    if store is not None:
+        records = dict((store.key(record), record) for record in store.records)
+        for task in tasks:
+            record = records.pop(task, None)
+            if record is not None:
+                outcomes.append(task[:4] + (record['error_rate'], record['capacity']))
+        tasks = [task for task in tasks if task not in store]
+
+    try:
+        for outcome in run_tasks(tasks, processes, chunk_size):
+            outcomes.append(outcome)
+            if store is not None:
+                record = outcome_record(outcome)
+                record['seed'] = seed
+                store.add(record)
+    finally:
+        if store is not None:
+            store.flush()
+
+    error_rates = {}
+    capacities = {}
+    for n, k, trial, learning_rule, rate, capacity in outcomes:
+        key = RESULT_KEYS.get(learning_rule, learning_rule)
+        error_rates.setdefault((n, k), {}).setdefault(key, []).append(rate)
+        capacities.setdefault(n, {})[key] = capacity
+
+    results = {}
+    for n, k in sorted(error_rates):
+        entry = {'k': k}
+        for key, rates in error_rates[(n, k)].items():
+            entry[key] = (1.0 * sum(rates)) / len(rates)
+        results.setdefault(n, []).append(entry)
+
+    return results, capacities
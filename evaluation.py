@@ -0,0 +1,61 @@
+import numpy as np
+
+from noise import noise_mask
+from random_state import check_random_state
+
+
+def evaluate_recall(network, exemplars, noise_levels, trials=100, chunk_size=1024, random_state=None, hamming=False,
+                    max_sweeps=None):
+    """
+    Measure how robustly a network recalls its exemplars from noisy probes.  For each noise level, trials noisy
+    probes are made from each exemplar and recalled with asynchronous updating.  Recall of a probe is an error if
+    the retrieved state differs from the exemplar the probe was made from.  The probes are made and recalled in
+    chunks of at most chunk_size, so memory does not grow with the number of trials.
+    :param network: the HopfieldNetwork to evaluate
+    :param exemplars: (k, n) array or list of the exemplars to make probes from
+    :param noise_levels: probabilities with which each value of a probe is flipped, or with hamming, the exact numbers
+    of values flipped in each probe
+    :param trials: number of probes made from each exemplar at each noise level
+    :param chunk_size: maximum number of probes recalled at once
+    :param random_state: None, an int seed or a numpy RandomState to draw the noise from
+    :param hamming: are the noise levels exact numbers of flipped values rather than probabilities?
+    :param max_sweeps: maximum number of sweeps applied to any probe, or None to sweep until converged
+    :return: dict holding the noise levels, the (levels, k) arrays error_rates and hamming_distances of the fraction
+    of probes recalled in error and the mean Hamming distance of the retrieved states from the exemplar, for each
+    noise level and exemplar, and their means over the exemplars, level_error_rates and level_hamming_distances
+    """
+    exemplars = np.array(exemplars, dtype=np.int8, ndmin=2)
+    k, n = exemplars.shape
+    assert(n == network.num_neurons)
+    assert(trials >= 1 and chunk_size >= 1)
+    random_state = check_random_state(random_state)
+
+    errors = np.zeros((len(noise_levels), k), dtype=np.int64)
+    distances = np.zeros((len(noise_levels), k), dtype=np.int64)
+
+    # Probes of each noise level are numbered exemplar-major, so probe j is made from exemplar j // trials
+    num_probes = k * trials
+    for level, noise in enumerate(noise_levels):
+        for start in range(0, num_probes, chunk_size):
+            owners = np.arange(start, min(start + chunk_size, num_probes)) // trials
+            targets = exemplars[owners]
+            if hamming:
+                flips = noise_mask(len(owners), n, random_state=random_state, hamming=noise)
+            else:
+                flips = noise_mask(len(owners), n, p=noise, random_state=random_state)
+            probes = np.where(flips, -targets, targets)
+
+            states, _, _ = network.asynchronous_recall_batch(probes, max_sweeps=max_sweeps)
+            distance = np.sum(states != targets, axis=1)
+            errors[level] += np.bincount(owners, weights=distance > 0, minlength=k).astype(np.int64)
+            distances[level] += np.bincount(owners, weights=distance, minlength=k).astype(np.int64)
+
+    error_rates = errors / float(trials)
+    hamming_distances = distances / float(trials)
+    return {
+        'noise_levels': list(noise_levels),
+        'error_rates': error_rates,
+        'hamming_distances': hamming_distances,
+        'level_error_rates': error_rates.mean(axis=1),
+        'level_hamming_distances': hamming_distances.mean(axis=1)
+    }
@@ -1,6 +1,9 @@
 import copy
+import numpy as np
 import random
 
+from noise import add_noise_batch
+
 
 class Exemplars(object):
     """
@@ -126,6 +129,25 @@ class Exemplars(object):
             self.__seven
         ])
 
+    # Read-only (8, 100) int8 array of the exemplars in vector form, built on first use by get_bank
+    __bank = None
+
+    @staticmethod
+    def get_bank(as_matrices=False):
+        """
+        The exemplars as a read-only int8 array, built once and shared by every caller
+        :param as_matrices: return a (8, 10, 10) view of the exemplars in their matrix form
+        :return: (8, 100) int8 array of the exemplars in vector form, or its (8, 10, 10) view
+        """
+        if Exemplars.__bank is None:
+            bank = np.array(Exemplars.get_exemplars(), dtype=np.int8)
+            bank.flags.writeable = False
+            Exemplars.__bank = bank
+
+        if as_matrices:
+            return Exemplars.__bank.reshape(-1, 10, 10)
+        return Exemplars.__bank
+
     @staticmethod
     def get_exemplars(as_matrices=False):
         x = Exemplars()
@@ -144,9 +166,14 @@ class Exemplars(object):
     def to_matrix(v_exemplar):
         """
         Convert the vector representation of an exemplar to its 10x10 matrix form
-        :param v_exemplar: list of 100 elements representing the exemplar
-        :return: the exemplar in its 10x10 matrix form
+        :param v_exemplar: list of 100 elements representing the exemplar, or an array of one or more exemplars
+        :return: the exemplar in its 10x10 matrix form, as a view for arrays
         """
+        if isinstance(v_exemplar, np.ndarray):
+            # A view of the vector, or of each vector of a (k, 100) array
+            assert(v_exemplar.shape[-1] == 100)
+            return v_exemplar.reshape(v_exemplar.shape[:-1] + (10, 10))
+
         assert(len(v_exemplar) == 100)
         return list([
             v_exemplar[0:10],
@@ -165,9 +192,14 @@ class Exemplars(object):
     def to_vector(exemplar):
         """
         Convert the matrix representation of the exemplar to its vector form (100 elements) 
-        :param exemplar: 10x10 matrix form the exemplar
-        :return: a 100 element list representing the vector for that exemplar
+        :param exemplar: 10x10 matrix form the exemplar, or an array of one or more exemplars
+        :return: a 100 element list representing the vector for that exemplar, or a view for arrays
         """
+        if isinstance(exemplar, np.ndarray):
+            # A view of the matrix, or of each matrix of a (k, 10, 10) array
+            assert(exemplar.shape[-2:] == (10, 10))
+            return exemplar.reshape(exemplar.shape[:-2] + (100,))
+
         assert(len(exemplar) == 10)
         return list([col for row in exemplar for col in row])
 
@@ -190,6 +222,20 @@ class Exemplars(object):
         noisy_exemplar = copy.deepcopy(exemplar)
         return [flip_bit(x) for x in noisy_exemplar]
 
+    @staticmethod
+    def add_noise_batch(exemplar, p=.25, count=1, random_state=None, hamming=None):
+        """
+        Make count noisy copies of an exemplar at once, flipping each value with probability p, or exactly hamming
+        values of each copy.  See noise.add_noise_batch.
+        :param exemplar: exemplar to add noise to
+        :param p: probability with which to add noise
+        :param count: number of noisy copies to make
+        :param random_state: None, an int seed or a numpy RandomState to draw the noise from
+        :param hamming: optional exact number of values to flip in each copy
+        :return: (count, n) int8 array of noisy copies of the exemplar
+        """
+        return add_noise_batch(exemplar, p=p, count=count, random_state=random_state, hamming=hamming)
+
 
 
 
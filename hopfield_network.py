@@ -1,6 +1,77 @@
-import copy
+import json
+import logging
 import math
 import numpy as np
+import os
+import sys
+import tempfile
+
+from attractor_index import AttractorIndex
+import bipolar
+import network_stats
+from recall_cache import RecallCache
+from network_stats import TRAINING, SYNCHRONOUS_RECALL, ASYNCHRONOUS_RECALL, BATCH_RECALL, PACKED_RECALL
+from random_state import check_random_state
+from recall_trace import EXEMPLAR_ADDED, ITERATION, FLIP, SWEEP
+import weights
+from weights import DenseWeights, PackedSymmetricWeights, PatternOverlapWeights, ScaledIntegerWeights, FIELD_TOLERANCE
+
+# Reasons for recall to stop
+CONVERGED = 'converged'
+CYCLE = 'cycle'
+MAX_ITERATIONS = 'max_iterations'
+ENERGY_MINIMUM = 'energy_minimum'
+
+# Orders in which neurons are updated by asynchronous recall
+SEQUENTIAL = 'sequential'
+PERMUTATION = 'permutation'
+RANDOM = 'random'
+
+# Storage for the weights of the network
+DENSE = 'dense'
+FLOAT32 = 'float32'
+SCALED = 'scaled'
+PACKED = 'packed'
+OVERLAP = 'overlap'
+
+# Version of the on-disk format written by HopfieldNetwork.save
+FORMAT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def _debug_logger():
+    """
+    Logger for networks created with debug=True, which prints their debug output to stdout
+    """
+    debug_logger = logging.getLogger(__name__ + '.debug')
+    if not debug_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        debug_logger.addHandler(handler)
+        debug_logger.setLevel(logging.DEBUG)
+        debug_logger.propagate = False
+    return debug_logger
+
+
+def _write_temporary(path, filename, write):
+    """
+    Write a file under a temporary name in a directory, to be renamed into place once complete
+    :param path: directory
+    :param filename: name the file will be renamed to
+    :param write: function writing the contents to a binary file object
+    :return: path of the temporary file
+    """
+    fd, temporary = tempfile.mkstemp(prefix='.' + filename + '.', dir=path)
+    try:
+        with os.fdopen(fd, 'wb') as temporary_file:
+            write(temporary_file)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+    except:
+        os.remove(temporary)
+        raise
+    return temporary
 
 
 class HopfieldNetwork(object):
@@ -9,20 +80,35 @@ class HopfieldNetwork(object):
     for the network are infered from the exemplar vectors supplied during the initialization.
     """
 
-    def __init__(self, v_exemplars, learning_rule='Hebb', debug=False):
+    def __init__(self, v_exemplars, learning_rule='Hebb', debug=False, chunk_size=None, storage=DENSE,
+                 checkpoints=False, trace=None, stats=None, cache_size=None,
+                 attractor_index=False):
         """
         Initialize a Hopfield Network given a list of exemplars and a specified learning rule
         :param v_exemplars: list of exemplars (list of vectors)
         :param learning_rule: "Hebb" = Hebbian Learning Rule,  'Storkey' = Storkey Learning Rule
-        :param debug:  Should debug output be printed?  Default is False.  
+        :param debug:  Should debug output be printed?  Default is False.  Otherwise debug output is logged to the
+        hopfield_network logger, and only formatted when it is enabled for DEBUG.
+        :param chunk_size: number of exemplars per matrix product under Hebbian learning.  Default is None, which
+        trains on all exemplars in a single product.
+        :param storage: how the weights are stored.  Default is DENSE.
+            DENSE = the n x n float64 weight matrix
+            FLOAT32 = the n x n weight matrix in float32
+            SCALED = the integer matrix nW in int16 or int32 (Hebbian learning only)
+            PACKED = the n(n - 1)/2 float64 weights above the diagonal of the symmetric weight matrix
+            OVERLAP = only the exemplars, computing local fields from the overlaps of a state with them (Hebbian
+            learning only)
+        :param checkpoints: keep a copy of the weight matrix after each exemplar under Storkey learning, so that
+        forgetting exemplars rolls back to a checkpoint rather than retraining.  Default is False.
+        :param trace: optional trace sink, called as trace(event, a, b) with the integer code and values of each
+        training and recall event (see recall_trace).  Default is None.
+        :param stats: optional NetworkStats to count the work done by the network in.  Default is None.
+        :param cache_size: maximum number of asynchronous recall results to cache (see recall_cache).  Default is
+        None, which caches nothing.
+        :param attractor_index: keep an AttractorIndex of the stable exemplars and the spurious states recall
+        converges to, so that asynchronous recall stops as soon as it reaches a known attractor and can report
+        which one it reached.  Default is False.
         """
-        # Initialize a logger for debug purposes
-        def logger(msg):
-            if debug:
-                print msg
-
-        self.__logger = logger
-
         # Need at least 1 exemplar
         assert(len(v_exemplars[0]) >= 1)
 
@@ -30,40 +116,73 @@ class HopfieldNetwork(object):
         n = len(v_exemplars[0])
         for exemplar in v_exemplars:
             assert(len(exemplar) == n)
-        self.__exemplars = v_exemplars
 
         # The number of neurons is the number of elements in each exemplar
-        self.__num_neurons = len(self.__exemplars[0])
+        self.__setup(v_exemplars, n, learning_rule, storage, debug, checkpoints, trace, stats)
+        if cache_size is not None:
+            self.__recall_cache = RecallCache(cache_size)
+        if attractor_index:
+            self.__attractor_index = AttractorIndex()
 
-        # Hebbian learning
-        if learning_rule is "Hebb":
-            self.__hebbian_learning_rule(v_exemplars)
-        elif learning_rule == "Storkey":
-            self.__storkey_learning(v_exemplars)
+        # Hebbian or Storkey learning
+        if learning_rule == "Hebb":
+            self.__hebbian_learning_rule(v_exemplars, chunk_size)
         else:
-            print "Unrecognized rule"
-            # throw exception...
+            self.__storkey_learning(v_exemplars)
+
+    def __setup(self, v_exemplars, num_neurons, learning_rule, storage, debug, checkpoints, trace=None, stats=None):
+        """
+        Initialize the state of the network other than its weights
+        :param v_exemplars: list of stored exemplars, or None if they are not known
+        :param num_neurons: number of neurons
+        :param learning_rule: "Hebb" or "Storkey"
+        :param storage: how the weights are stored
+        :param debug: should debug output be printed?
+        :param checkpoints: keep a copy of the weight matrix after each exemplar under Storkey learning?
+        :param trace: optional trace sink
+        :param stats: optional NetworkStats
+        """
+        # Logger for debug purposes
+        self.__logger = _debug_logger() if debug else logger
+        self.__trace = trace
+        self.__stats = stats
+
+        self.__exemplars = list(v_exemplars) if v_exemplars is not None else None
+        self.__num_exemplars = len(v_exemplars) if v_exemplars is not None else None
+        self.__learning_rule = learning_rule
+        self.__num_neurons = num_neurons
+
+        # Weight matrix after each exemplar under Storkey learning
+        self.__checkpoints = [] if checkpoints else None
 
+        # Stored exemplars in bit-packed and dense form, built on first use by packed_recall
+        self.__packed_exemplars = None
 
-    def __hebbian_learning_rule(self, v_exemplars):
+        # Cache of asynchronous recall results, or None
+        self.__recall_cache = None
+
+        # Index of the known attractors, or None.  The stable exemplars are indexed on first use.
+        self.__attractor_index = None
+        self.__attractors_indexed = False
+
+        if learning_rule not in ("Hebb", "Storkey"):
+            raise ValueError("Unrecognized learning rule: {0}".format(learning_rule))
+        if storage not in (DENSE, FLOAT32, SCALED, PACKED, OVERLAP):
+            raise ValueError("Unrecognized storage: {0}".format(storage))
+        if storage in (SCALED, OVERLAP) and learning_rule != "Hebb":
+            raise ValueError("{0} storage requires the Hebbian learning rule".format(storage))
+        self.__storage = storage
+
+    def __hebbian_learning_rule(self, v_exemplars, chunk_size=None):
         """
         Implement the Hebb rule for learning the Hopfield network
         :param v_exemplars: exemplars
+        :param chunk_size: number of exemplars per matrix product, or None to use all of them at once
         :return: initialized weight matrix
         """
-        # Start with an empty weights matrix
-        self.__weight_matrix = np.zeros(shape=(self.__num_neurons, self.__num_neurons))
-
-        # Initialize the weight matrix
-        for exemplar in v_exemplars:
-            n = len(exemplar)
-            # Hebbian Learning Rule:  w_ij_new = w_ij_current + (1/num neurons) * e_i * e_j
-            # where i & j are neuron indices & indices into the exemplar
-            weights_delta = np.outer(exemplar, exemplar)
-            weights_delta = (1.0 /n) * weights_delta
-
-            np.fill_diagonal(weights_delta, 0)
-            self.__weight_matrix = np.add(self.__weight_matrix, weights_delta)
+        n = self.__num_neurons
+        stats = self.__stats
+        start = network_stats.clock() if stats is not None else None
 
         # Capacity for a Hopfield Network trained via Hebbian learning
         if self.__num_neurons > 1:
@@ -71,55 +190,136 @@ class HopfieldNetwork(object):
         else:
             self.__capacity = 1
 
-    def __storkey_learning(self, v_exemplars):
+        # The weight matrix is implied by the exemplars
+        if self.__storage == OVERLAP:
+            self.__weights = PatternOverlapWeights(v_exemplars)
+            self.__count_training(start, len(v_exemplars))
+            return
+
+        # Hebbian Learning Rule:  w_ij = (1/num neurons) * sum_v e^v_i * e^v_j  for i != j, which is X^T X / n
+        # for the (k, n) exemplar matrix X.  Large exemplar sets are streamed through in chunks of rows.
+        if chunk_size is None:
+            exemplars = np.asarray(v_exemplars, dtype=np.float64)
+            weight_matrix = np.dot(exemplars.T, exemplars)
+        else:
+            assert(chunk_size >= 1)
+            weight_matrix = np.zeros(shape=(n, n))
+            for row in range(0, len(v_exemplars), chunk_size):
+                chunk = np.asarray(v_exemplars[row:row + chunk_size], dtype=np.float64)
+                weight_matrix += np.dot(chunk.T, chunk)
+
+        np.fill_diagonal(weight_matrix, 0)
+        self.__store_hebbian_counts(weight_matrix)
+        self.__count_training(start, len(v_exemplars))
+
+    def __count_training(self, start, num_exemplars):
         """
-        Implement the Storkey Learning Rule
-        :param v_exemplars: 
+        Count training in the stats of the network, if it has any
+        :param start: clock time training started at
+        :param num_exemplars: number of exemplars trained
         """
+        stats = self.__stats
+        if stats is not None:
+            stats.exemplars_trained += num_exemplars
+            stats.add_time(TRAINING, network_stats.clock() - start)
 
-        # Start with empty matrix  (w_ij^0)
-        self.__weight_matrix = np.zeros(shape=(self.__num_neurons, self.__num_neurons))
+    def __store_hebbian_counts(self, counts):
+        """
+        Store the weights of a network trained with the Hebb rule
+        :param counts: the float64 matrix n * W, whose entries are integers.  It is overwritten.
+        """
+        if self.__storage == SCALED:
+            self.__weights = ScaledIntegerWeights(counts, self.__num_neurons)
+        else:
+            counts /= self.__num_neurons
+            self.__store_weight_matrix(counts)
 
-        # Incrementally include each exemplar
-        for exemplar in v_exemplars:
+    def __store_weight_matrix(self, weight_matrix):
+        """
+        Store the weight matrix in the storage chosen for the network
+        :param weight_matrix: the float64 n x n weight matrix
+        """
+        dtype = np.float32 if self.__storage == FLOAT32 else np.float64
+        self.__weights = weights.from_matrix(weight_matrix, dtype=dtype, symmetric=self.__storage == PACKED)
 
-            self.__logger("Adding Exemplar {0}".format(exemplar))
-            weight_matrix_v = np.zeros(shape=(self.__num_neurons, self.__num_neurons))
+    def __hebbian_update(self, v_exemplars, sign):
+        """
+        Add exemplars to, or remove them from, a network trained with the Hebb rule
+        :param v_exemplars: exemplars
+        :param sign: 1 to add the exemplars, -1 to remove them
+        """
+        start = network_stats.clock() if self.__stats is not None else None
+        if isinstance(self.__weights, PatternOverlapWeights):
+            self.__weights = PatternOverlapWeights(self.__exemplars)
+            self.__count_training(start, len(v_exemplars))
+            return
 
-            def h(i, j, w, e, n):
-                h_ij = sum([w[i][k] * e[k] for k in range(1, n) if k != i and k != j])
-                return h_ij
+        n = self.__num_neurons
+        exemplars = np.array(v_exemplars, dtype=np.float64, ndmin=2)
+        weights_delta = np.dot(exemplars.T, exemplars)
+        np.fill_diagonal(weights_delta, 0)
 
-            for i in range(len(exemplar)):
-                for j in range(len(exemplar)):
+        # n * w_ij is an integer under the Hebb rule.  Updating that integer matrix and dividing once makes removing
+        # exemplars restore exactly the weights from before they were added.
+        weight_matrix = np.rint(self.__weights.to_dense() * n)
+        weight_matrix += sign * weights_delta
+        self.__store_hebbian_counts(weight_matrix)
+        self.__count_training(start, len(v_exemplars))
 
-                    # skip i == j
-                    if i == j:
-                        continue
+    def __storkey_learning(self, v_exemplars, weight_matrix=None):
+        """
+        Implement the Storkey Learning Rule
+        :param v_exemplars: exemplars, included in order
+        :param weight_matrix: weight matrix to include the exemplars in.  Default is None, which starts from an empty
+        matrix.
+        """
+        start = network_stats.clock() if self.__stats is not None else None
+
+        # Start with empty matrix  (w_ij^0)
+        if weight_matrix is None:
+            weight_matrix = np.zeros(shape=(self.__num_neurons, self.__num_neurons))
 
-                    # 1st term = 1/n EV_i EV_j
-                    t1 = (1.0 / self.__num_neurons) * exemplar[i] * exemplar[j]
+        n = self.__num_neurons
+        debug = self.__logger.isEnabledFor(logging.DEBUG)
+        trace = self.__trace
 
-                    # 2nd term  = 1/n E^v_{i}H^v_{j,i}
-                    t2 = (1.0 / self.__num_neurons) * exemplar[i] * \
-                         h(j, i, self.__weight_matrix, exemplar, self.__num_neurons)
+        # Incrementally include each exemplar
+        for index, exemplar in enumerate(v_exemplars):
+
+            if debug:
+                self.__logger.debug("Adding Exemplar %s", exemplar)
+            if trace is not None:
+                trace(EXEMPLAR_ADDED, index, 0)
+            e = np.asarray(exemplar, dtype=np.float64)
+            w = weight_matrix
 
-                    # 3rd term = 1/n h^v_{i,j} E^v_{j}
-                    t3 = (1.0 / self.__num_neurons) * h(i, j, self.__weight_matrix, exemplar, self.__num_neurons) * \
-                         exemplar[j]
+            # Local fields h_ij = sum_{k != i, j} w_ik e_k for every (i, j) at once, summed over k in [1, n) as in
+            # the original element-wise rule.  The diagonal of w is zero, so this is the field (w e)_i less the
+            # contribution of neuron j, with neuron 0 masked out of e.
+            e_h = e.copy()
+            e_h[0] = 0
+            field = np.dot(w, e_h)
+            h = field[:, np.newaxis] - w * e_h[np.newaxis, :]
 
-                    weight_matrix_v[i][j] = self.__weight_matrix[i][j] + t1 - t2 - t3
-                    self.__logger("w_{0},{1} = {2} + {3} - {4} - {5}".format(i, j, self.__weight_matrix[i][j],
-                                                                             t1, t2, t3))
+            # w_ij_new = w_ij + 1/n e_i e_j - 1/n e_i h_ji - 1/n h_ij e_j
+            weights_delta = np.outer(e, e) - e[:, np.newaxis] * h.T - h * e[np.newaxis, :]
+            weights_delta *= (1.0 / n)
+            np.fill_diagonal(weights_delta, 0)
 
             # Update the weight matrix
-            self.__weight_matrix = weight_matrix_v
+            weight_matrix = w + weights_delta
+            if self.__checkpoints is not None:
+                self.__checkpoints.append(weight_matrix)
 
-            # Capacity for a Hopfield Network trained using Storkey
-            if self.__num_neurons > 1:
-                self.__capacity = (1.0 * self.__num_neurons) / math.sqrt(2 * math.log(self.__num_neurons))
-            else:
-                self.__capacity = 1
+        self.__store_weight_matrix(weight_matrix)
+
+        # Capacity for a Hopfield Network trained using Storkey
+        if self.__num_neurons > 1:
+            self.__capacity = (1.0 * self.__num_neurons) / math.sqrt(2 * math.log(self.__num_neurons))
+        else:
+            self.__capacity = 1
+
+        self.__count_training(start, len(v_exemplars))
 
     @property
     def num_neurons(self):
@@ -127,96 +327,906 @@ class HopfieldNetwork(object):
 
     @property
     def num_exemplars(self):
-        return len(self.__v_exemplars)
+        if self.__exemplars is None:
+            return self.__num_exemplars
+        return len(self.__exemplars)
+
+    @property
+    def has_exemplars(self):
+        """
+        :return: whether the network knows its stored exemplars, which a network loaded without them does not
+        """
+        return self.__exemplars is not None
+
+    def __require_exemplars(self, action):
+        """
+        :param action: what needs the stored exemplars
+        :raise ValueError: if the network does not know its stored exemplars
+        """
+        if self.__exemplars is None:
+            raise ValueError("{0} requires the stored exemplars, which were not saved with the network".format(action))
+
+    @property
+    def learning_rule(self):
+        return self.__learning_rule
 
     @property
     def capacity(self):
         return self.__capacity
 
+    @property
+    def storage(self):
+        return self.__storage
+
+    @property
+    def weights_nbytes(self):
+        return self.__weights.nbytes
+
+    @property
+    def trace(self):
+        return self.__trace
+
+    @trace.setter
+    def trace(self, trace):
+        """
+        :param trace: trace sink, called as trace(event, a, b) with the integer code and values of each training and
+        recall event, or None
+        """
+        self.__trace = trace
+
+    @property
+    def stats(self):
+        return self.__stats
+
+    @stats.setter
+    def stats(self, stats):
+        """
+        :param stats: NetworkStats to count the work done by the network in, or None to stop counting
+        """
+        self.__stats = stats
+
+    @property
+    def recall_cache(self):
+        return self.__recall_cache
+
+    @recall_cache.setter
+    def recall_cache(self, recall_cache):
+        """
+        :param recall_cache: RecallCache to cache asynchronous recall results in, or None to stop caching.  Results
+        it already holds must have been recalled by this network with its current weights.
+        """
+        self.__recall_cache = recall_cache
+
+    @property
+    def attractor_index(self):
+        return self.__attractor_index
+
+    @attractor_index.setter
+    def attractor_index(self, attractor_index):
+        """
+        :param attractor_index: AttractorIndex to keep the known attractors of the network in, or None to stop
+        indexing them.  Attractors it already holds are forgotten.
+        """
+        if attractor_index is not None:
+            attractor_index.clear()
+        self.__attractor_index = attractor_index
+        self.__attractors_indexed = False
+
     @property
     def weight_matrix(self):
-        return self.__weight_matrix
+        return self.__weights.to_dense()
+
+    def save(self, path, exemplars=True):
+        """
+        Save the network to a directory, which is created if needed.  The directory holds a JSON header with the
+        format version, learning rule, storage and capacity of the network, and an .npy file for each array of its
+        weights, which HopfieldNetwork.load can memory-map.  Every file is written under a temporary name and renamed
+        into place, so a network memory-mapped from the directory, including this one, keeps its weights.
+        :param path: directory to save the network to
+        :param exemplars: also save the stored exemplars?  Default is True.  A network loaded without them can recall,
+        but cannot add or forget exemplars, use packed_recall or index its attractors.  OVERLAP weights are the
+        exemplars themselves, so they are always saved, once.
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        arrays = self.__weights.arrays
+        overlap = self.__storage == OVERLAP
+        exemplars = (exemplars or overlap) and self.__exemplars is not None
+        files = [('weights_{0}.npy'.format(name), array) for name, array in sorted(arrays.items())]
+        if exemplars and not overlap:
+            files.append(('exemplars.npy', np.array(self.__exemplars, dtype=np.int8)))
+
+        header = {
+            'format_version': FORMAT_VERSION,
+            'learning_rule': self.__learning_rule,
+            'storage': self.__storage,
+            'capacity': self.__capacity,
+            'num_neurons': self.__num_neurons,
+            'arrays': sorted(arrays.keys()),
+            'exemplars': exemplars,
+            'num_exemplars': self.num_exemplars
+        }
+
+        staged = []
+        try:
+            for filename, array in files:
+                staged.append((_write_temporary(path, filename, lambda f, array=array: np.save(f, array)), filename))
+            staged.append((_write_temporary(path, 'network.json',
+                                            lambda f: json.dump(header, f, indent=2, sort_keys=True)), 'network.json'))
+        except:
+            for temporary, _ in staged:
+                os.remove(temporary)
+            raise
+
+        # Any earlier header is removed first and the header is renamed into place last, so an interrupted save
+        # cannot be loaded with a mix of old and new arrays
+        header_path = os.path.join(path, 'network.json')
+        if os.path.exists(header_path):
+            os.remove(header_path)
+        for temporary, filename in staged:
+            os.rename(temporary, os.path.join(path, filename))
+
+    @classmethod
+    def load(cls, path, mmap=True, debug=False):
+        """
+        Load a network saved by HopfieldNetwork.save
+        :param path: directory the network was saved to
+        :param mmap: memory-map the weights read-only rather than reading them into memory, so that processes
+        loading the same network share one copy of the weights through the page cache.  Default is True.
+        :param debug: Should debug output be printed?  Default is False.
+        :return: the HopfieldNetwork
+        """
+        with open(os.path.join(path, 'network.json')) as header_file:
+            header = json.load(header_file)
+        if header['format_version'] > FORMAT_VERSION:
+            raise ValueError("Unsupported network format version: {0}".format(header['format_version']))
+
+        mmap_mode = 'r' if mmap else None
+        arrays = dict((name, np.load(os.path.join(path, 'weights_{0}.npy'.format(name)), mmap_mode=mmap_mode))
+                      for name in header['arrays'])
+        if not header['exemplars']:
+            v_exemplars = None
+        elif header['storage'] == OVERLAP:
+            v_exemplars = arrays['exemplars']
+        else:
+            v_exemplars = np.load(os.path.join(path, 'exemplars.npy'))
+
+        network = cls.__new__(cls)
+        network.__setup(v_exemplars, header['num_neurons'], str(header['learning_rule']), str(header['storage']),
+                        debug, False)
+        network.__capacity = header['capacity']
+        if v_exemplars is None:
+            network.__num_exemplars = header.get('num_exemplars')
+
+        storage = network.__storage
+        if storage in (DENSE, FLOAT32):
+            network.__weights = DenseWeights(arrays['matrix'])
+        elif storage == SCALED:
+            network.__weights = ScaledIntegerWeights(arrays['counts'], network.__num_neurons)
+        elif storage == PACKED:
+            network.__weights = PackedSymmetricWeights(arrays['packed'])
+        else:
+            network.__weights = PatternOverlapWeights(arrays['exemplars'])
+        return network
 
-    def synchronous_recall(self, v_p, max_iterations=10):
+    def add_exemplars(self, v_exemplars):
+        """
+        Store additional exemplars in the network without retraining on the existing ones.  Under the Hebb rule this
+        is a rank-k update of the weights; under the Storkey rule the exemplars are included in order.
+        :param v_exemplars: list of exemplars to add
+        """
+        if len(v_exemplars) == 0:
+            return
+        self.__require_exemplars("Adding exemplars")
+        for exemplar in v_exemplars:
+            assert(len(exemplar) == self.__num_neurons)
+
+        self.__exemplars.extend(v_exemplars)
+        self.__weights_changed()
+
+        if self.__learning_rule == "Hebb":
+            self.__hebbian_update(v_exemplars, 1)
+        else:
+            self.__storkey_learning(v_exemplars, self.__weights.to_dense())
+
+    def forget_exemplars(self, v_exemplars):
+        """
+        Remove stored exemplars from the network.  Under the Hebb rule this exactly reverses adding them.  Under the
+        Storkey rule the weights are rolled back to before the earliest forgotten exemplar, from its checkpoint if
+        checkpoints are kept or from scratch otherwise, and the later exemplars are included again in order.
+        :param v_exemplars: list of exemplars to remove, each of which must be stored in the network
+        """
+        if len(v_exemplars) == 0:
+            return
+        self.__require_exemplars("Forgetting exemplars")
+
+        # Positions of the exemplars to forget, matching each against a distinct stored exemplar
+        forgotten = set()
+        for exemplar in v_exemplars:
+            matches = [i for i, stored in enumerate(self.__exemplars)
+                       if i not in forgotten and np.array_equal(stored, exemplar)]
+            if not matches:
+                raise ValueError("Exemplar is not stored in the network: {0}".format(exemplar))
+            forgotten.add(matches[0])
+
+        if len(forgotten) == len(self.__exemplars):
+            raise ValueError("Cannot forget every exemplar stored in the network")
+
+        earliest = min(forgotten)
+        remaining = [stored for i, stored in enumerate(self.__exemplars) if i not in forgotten]
+        self.__exemplars = remaining
+        self.__weights_changed()
+
+        if self.__learning_rule == "Hebb":
+            self.__hebbian_update(v_exemplars, -1)
+        elif self.__checkpoints is not None:
+            del self.__checkpoints[earliest:]
+            weight_matrix = self.__checkpoints[-1] if self.__checkpoints else None
+            self.__storkey_learning(remaining[earliest:], weight_matrix)
+        else:
+            self.__storkey_learning(remaining)
+
+    def __weights_changed(self):
+        """
+        Discard everything derived from the stored exemplars and weights, as they are about to change
+        """
+        self.__packed_exemplars = None
+        if self.__recall_cache is not None:
+            self.__recall_cache.clear()
+        if self.__attractor_index is not None:
+            self.__attractor_index.clear()
+        self.__attractors_indexed = False
+
+    def __indexed_attractors(self):
+        """
+        :return: the attractor index of the network, after indexing the stable exemplars if they are not yet
+        """
+        index = self.__attractor_index
+        if not self.__attractors_indexed:
+            self.__require_exemplars("Indexing attractors")
+            if self.__exemplars:
+                exemplars = np.array(self.__exemplars, dtype=np.int8, ndmin=2)
+                stable, _, _ = self.stable_patterns(exemplars)
+                index.add_exemplars(exemplars, stable)
+            self.__attractors_indexed = True
+        return index
+
+    def __label_attractor(self, state, reason):
+        """
+        Find the label of the state an asynchronous recall ended in, indexing it if it is a new spurious attractor
+        :param state: the retrieved state
+        :param reason: the reason recall stopped
+        :return: the label of the attractor, or None if the state is not one
+        """
+        index = self.__indexed_attractors()
+        label = index.get(state)
+        if label is None and reason == CONVERGED:
+            label = index.add_spurious(state)
+        return label
+
+    def stable_patterns(self, v_patterns):
+        """
+        Find which patterns are fixed points of the network without recalling them.  The local fields of every
+        pattern are computed in a single product with the weights, and a bit is stable if the hard limiting function
+        of its field leaves it unchanged.  A pattern is stable exactly when recall from it returns it unchanged.
+        :param v_patterns: (k, n) array or list of bipolar patterns, such as the stored exemplars
+        :return: tuple of the (k,) boolean array of which patterns are stable, the (k, n) boolean array of which bits
+        are stable and the (k, n) float64 array of the margins x_i (Wx)_i, which are negative at unstable bits
+        """
+        patterns = np.array(v_patterns, dtype=np.int8, ndmin=2)
+        assert(patterns.shape[1] == self.__num_neurons)
+        fields = self.__weights.dot(patterns)
+        stable_bits = np.where(fields >= 0, 1, -1) == patterns
+
+        # Near-zero fields are decided as recall decides them, from the row product
+        for row, i in zip(*np.nonzero(np.abs(fields) <= FIELD_TOLERANCE)):
+            x_i = 1 if self.__weights.row_dot(i, patterns[row].astype(np.float64)) >= 0 else -1
+            stable_bits[row, i] = x_i == patterns[row, i]
+
+        if self.__stats is not None:
+            self.__stats.matvecs += len(patterns)
+        return np.all(stable_bits, axis=1), stable_bits, patterns * fields
+
+    def find_attractor(self, state):
+        """
+        Look up a state in the attractor index of the network
+        :param state: bipolar state vector
+        :return: (EXEMPLAR, index of the exemplar) or (SPURIOUS, index of the spurious attractor) if the state is a
+        known attractor, or None otherwise
+        """
+        if self.__attractor_index is None:
+            raise ValueError("The network has no attractor index")
+        return self.__indexed_attractors().get(state)
+
+    def synchronous_recall(self, v_p, max_iterations=10, stop_on_energy=False, return_reason=False,
+                           return_energy=False, return_history=False):
         """
         Recall an exemplar from the Hopfield network via F(Wv_p) where F is the hard limiting function and W is the 
-        weight matrix of the network
+        weight matrix of the network.  Recall stops when the state is unchanged (CONVERGED), when the state returns
+        to the one from two iterations ago (CYCLE), or after max_iterations iterations (MAX_ITERATIONS).
         :param v_p: a noisy representation of the exemplar we want to recover
-        :return: the retrieved exemplar
+        :param max_iterations: maximum number of iterations
+        :param stop_on_energy: stop as soon as no single neuron flip can lower the energy of the state, rather than
+        confirming it with another iteration.  Recall then stops with CONVERGED if the state is a fixed point and
+        ENERGY_MINIMUM otherwise.
+        :param return_reason: also return the reason recall stopped
+        :param return_energy: also return the energy of the state after each iteration
+        :param return_history: return the state after each iteration as an (iterations, n) int8 array, rather than
+        only the final state
+        :return: a list holding the retrieved exemplar, or with return_history the state after each iteration with
+        the retrieved exemplar last.  If return_reason or return_energy is True, a tuple of those states followed by
+        the reason recall stopped and/or the energies.
         """
+        stats = self.__stats
+        start = network_stats.clock() if stats is not None else None
+        debug = self.__logger.isEnabledFor(logging.DEBUG)
+        trace = self.__trace
+        if debug:
+            self.__logger.debug("Using synchronous recall.")
+            self.__logger.debug("Input vector is: %s", v_p)
 
-        def hard_limiter(x):
-            """
-            Apply the hard limiting function. F(x) = 1 if x>=0 else, -1
-            :param x: x
-            :return: 1 or -1
-            """
-            return 1 if x >= 0 else -1
+        # results to return
+        n = self.__num_neurons
+        results = _RecallHistory(n, max_iterations, return_history)
 
-        self.__logger("Using synchronous recall.")
-        self.__logger("Input vector is: {0}".format(v_p))
+        # State buffers for the current and previous two iterations, rotated in place each iteration
+        x_s = np.array(v_p, dtype=np.float64)
+        x_s_prev = np.empty(n)
+        x_s_prev2 = np.empty(n)
+        fields = np.empty(n)
+        active = np.empty(n, dtype=bool)
 
-        # results to return
-        results = list()
+        energies = list()
 
-        x_s = v_p
-        converged = False
-        i = 0
-        while not converged and i < max_iterations:
-            x_s_prev = copy.deepcopy(x_s)
+        reason = MAX_ITERATIONS
+        products = 0
+        for i in range(max_iterations):
+            x_s_prev2, x_s_prev, x_s = x_s_prev, x_s, x_s_prev2
 
-            x_s = np.dot(self.__weight_matrix, np.array([x_s]).transpose())
-            x_s = map(hard_limiter, x_s)
+            self.__weights.dot(x_s_prev, out=fields)
+            products += 1
+
+            # The fields of the previous iteration's state give its energy, and whether it is already stable
+            if i > 0:
+                if return_energy:
+                    energies.append(self.energy(x_s_prev, fields))
+                if stop_on_energy and _energy_minimum(x_s_prev, fields):
+                    reason = CONVERGED if _fixed_point(x_s_prev, fields) else ENERGY_MINIMUM
+                    break
+
+            # Apply the hard limiting function. F(x) = 1 if x>=0 else, -1
+            np.greater_equal(fields, 0, out=active)
+            np.multiply(active, 2.0, out=x_s)
+            x_s -= 1
 
             results.append(x_s)
 
-            self.__logger("x_s: {0}, x_s_prev: {1}".format(x_s, x_s_prev))
+            if debug:
+                self.__logger.debug("x_s: %s, x_s_prev: %s", x_s, x_s_prev)
+            if trace is not None:
+                trace(ITERATION, i, np.count_nonzero(x_s != x_s_prev))
             # Convergence when the state of the neurons (x_s) is unchanged
-            if x_s == x_s_prev:
-                converged = True
+            if np.array_equal(x_s, x_s_prev):
+                reason = CONVERGED
+                break
+            # A limit cycle of length 2 when the state returns to the one before the previous iteration
+            if i > 0 and np.array_equal(x_s, x_s_prev2):
+                reason = CYCLE
+                break
 
-        return results
+        if return_energy and len(energies) < len(results):
+            energies.append(self.energy(results.last))
+
+        if stats is not None:
+            stats.recalls += 1
+            stats.iterations += len(results)
+            stats.matvecs += products
+            stats.bytes_allocated += 4 * x_s.nbytes + active.nbytes + results.nbytes
+            stats.add_time(SYNCHRONOUS_RECALL, network_stats.clock() - start)
+
+        return _recall_returns(results.results(), (return_reason, reason), (return_energy, np.array(energies)))
+
+    def synchronous_recall_batch(self, probes, max_iterations=10, return_reasons=False):
+        """
+        Recall exemplars for many probes at once via synchronous updating.  Every probe still being updated is
+        advanced with a single matrix product per iteration.  As in synchronous_recall, a probe whose state is
+        unchanged by an iteration has converged, and a probe whose state returns to the one from two iterations ago
+        is in a cycle; either is masked out of subsequent iterations.
+        :param probes: (b, n) array (or list of b vectors) of noisy representations of exemplars
+        :param max_iterations: maximum number of iterations applied to any probe
+        :param return_reasons: also return the reason recall stopped for each probe
+        :return: (states, iterations, converged) - the (b, n) int8 array of final states, the number of iterations
+        applied to each probe, and whether each probe converged within max_iterations.  With return_reasons, a
+        fourth array holds the reason each probe stopped: CONVERGED, CYCLE or MAX_ITERATIONS.
+        """
+        stats = self.__stats
+        start = network_stats.clock() if stats is not None else None
+        states = np.array(probes, dtype=np.int8, ndmin=2)
+        assert(states.shape[1] == self.__num_neurons)
+
+        iterations = np.zeros(states.shape[0], dtype=np.int64)
+        converged = np.zeros(states.shape[0], dtype=bool)
+        cycled = np.zeros(states.shape[0], dtype=bool)
+
+        # indices of the probes that have not stopped yet, and their states from the iteration before the previous
+        active = np.arange(states.shape[0])
+        x_s_prev2 = None
+        for _ in range(max_iterations):
+            if active.size == 0:
+                break
 
-    def asynchronous_recall(self, v_p):
+            x_s_prev = states[active]
+            fields = self.__weights.dot(x_s_prev)
+            x_s = np.where(fields >= 0, 1, -1).astype(np.int8)
+            iterations[active] += 1
+            if stats is not None:
+                stats.bytes_allocated += x_s_prev.nbytes + fields.nbytes + x_s.nbytes
+
+            unchanged, cycle = _batch_stops(x_s, x_s_prev, x_s_prev2)
+            states[active] = x_s
+            converged[active[unchanged]] = True
+            cycled[active[cycle]] = True
+
+            running = ~(unchanged | cycle)
+            active = active[running]
+            x_s_prev2 = x_s_prev[running]
+
+        if stats is not None:
+            total = int(iterations.sum())
+            stats.recalls += len(states)
+            stats.iterations += total
+            stats.matvecs += total
+            stats.bytes_allocated += states.nbytes
+            stats.add_time(BATCH_RECALL, network_stats.clock() - start)
+
+        if return_reasons:
+            return states, iterations, converged, _batch_reasons(converged, cycled)
+        return states, iterations, converged
+
+    def packed_recall(self, packed_probes, max_iterations=10, chunk_size=1024, return_reasons=False):
+        """
+        Recall exemplars for many bit-packed probes at once via synchronous updating, without using the weight
+        matrix.  For the Hebbian rule W = (X^T X - kI) / n for the (k, n) exemplar matrix X, so the local fields are
+        (X^T m - kx) / n where m = Xx are the overlaps of the state with the stored exemplars.  The overlaps are
+        counted from the packed bits via XNOR/popcount.  The probes are recalled in chunks of at most chunk_size, so
+        the memory used by the overlaps and fields does not grow with the number of probes.
+        :param packed_probes: (b, w) uint64 array of probes packed by bipolar.pack
+        :param max_iterations: maximum number of iterations applied to any probe
+        :param chunk_size: maximum number of probes recalled at once
+        :param return_reasons: also return the reason recall stopped for each probe
+        :return: (states, iterations, converged) - the (b, w) uint64 array of final packed states, the number of
+        iterations applied to each probe, and whether each probe converged within max_iterations.  Probes stop as in
+        synchronous_recall_batch, and with return_reasons a fourth array holds the reason each probe stopped.
         """
-        Recall an exemplar using asynchronous updating.
+        if self.__learning_rule != "Hebb":
+            raise ValueError("Packed recall requires a network trained with the Hebbian learning rule")
+        stats = self.__stats
+        start = network_stats.clock() if stats is not None else None
+
+        n = self.__num_neurons
+        if self.__packed_exemplars is None:
+            self.__require_exemplars("Packed recall")
+            exemplars = np.array(self.__exemplars, dtype=np.float64, ndmin=2)
+            self.__packed_exemplars = (bipolar.pack(exemplars), exemplars)
+        packed_exemplars, exemplars = self.__packed_exemplars
+        k = exemplars.shape[0]
+
+        states = np.array(packed_probes, dtype=np.uint64, ndmin=2)
+        assert(states.shape[1] == bipolar.num_words(n))
+        assert(chunk_size >= 1)
+
+        iterations = np.zeros(states.shape[0], dtype=np.int64)
+        converged = np.zeros(states.shape[0], dtype=bool)
+        cycled = np.zeros(states.shape[0], dtype=bool)
+
+        for begin in range(0, states.shape[0], chunk_size):
+            # indices of the probes of the chunk that have not stopped yet, and their states from the iteration
+            # before the previous
+            active = np.arange(begin, min(begin + chunk_size, states.shape[0]))
+            x_s_prev2 = None
+            for _ in range(max_iterations):
+                if active.size == 0:
+                    break
+
+                x_s_prev = states[active]
+                m = bipolar.overlaps(x_s_prev, packed_exemplars, n)
+                fields = np.dot(m, exemplars) - k * bipolar.unpack(x_s_prev, n)
+
+                # Apply the hard limiting function. F(x) = 1 if x>=0 else, -1
+                x_s = bipolar.pack(fields >= 0)
+                iterations[active] += 1
+                if stats is not None:
+                    stats.bytes_allocated += x_s_prev.nbytes + m.nbytes + fields.nbytes + x_s.nbytes
+
+                unchanged, cycle = _batch_stops(x_s, x_s_prev, x_s_prev2)
+                states[active] = x_s
+                converged[active[unchanged]] = True
+                cycled[active[cycle]] = True
+
+                running = ~(unchanged | cycle)
+                active = active[running]
+                x_s_prev2 = x_s_prev[running]
+
+        if stats is not None:
+            total = int(iterations.sum())
+            stats.recalls += len(states)
+            stats.iterations += total
+            stats.matvecs += total
+            stats.bytes_allocated += states.nbytes
+            stats.add_time(PACKED_RECALL, network_stats.clock() - start)
+
+        if return_reasons:
+            return states, iterations, converged, _batch_reasons(converged, cycled)
+        return states, iterations, converged
+
+    def asynchronous_recall(self, v_p, schedule=SEQUENTIAL, max_sweeps=None, random_state=None,
+                            stop_on_energy=False, return_reason=False, return_energy=False, return_history=False,
+                            return_attractor=False):
+        """
+        Recall an exemplar using asynchronous updating.  Each sweep makes n single-neuron updates, in the order
+        given by the schedule:
+            SEQUENTIAL = neurons in index order
+            PERMUTATION = a random permutation of the neurons, drawn anew for each sweep
+            RANDOM = n neurons drawn uniformly at random with replacement
+        Recall stops when the state is a fixed point of the network (CONVERGED), or after max_sweeps sweeps
+        (MAX_ITERATIONS).  The local field h = Wx is kept up to date as neurons flip, so each neuron is evaluated in
+        O(1) and each flip costs one column of W.  If the network has an attractor index, recall also stops with
+        CONVERGED as soon as a sweep reaches a known attractor, and a new fixed point it converges to is indexed as
+        a spurious attractor.
         :param v_p: noisy vector we want to recall from 
-        :return: [(i, result)]
+        :param schedule: order in which neurons are updated.  Default is SEQUENTIAL.
+        :param max_sweeps: maximum number of sweeps, or None to sweep until converged
+        :param random_state: seed or numpy RandomState for the random schedules
+        :param stop_on_energy: stop as soon as no single neuron flip can lower the energy of the state, rather than
+        confirming it with another sweep.  Recall then stops with CONVERGED if the state is a fixed point and
+        ENERGY_MINIMUM otherwise.
+        :param return_reason: also return the reason recall stopped
+        :param return_energy: also return the energy of the state after each sweep
+        :param return_history: return the state after each sweep as a (sweeps, n) int8 array, rather than only the
+        final state
+        :param return_attractor: also return the label of the attractor reached (see find_attractor), or None if
+        recall stopped elsewhere.  Requires an attractor index.
+        :return: a list holding the retrieved exemplar, or with return_history the state after each sweep with the
+        retrieved exemplar last.  If return_reason, return_energy or return_attractor is True, a tuple of those
+        states followed by the reason recall stopped, the energies and/or the attractor.
+
+        If the network has a recall cache, the retrieved exemplar and reason of a deterministic recall (a bipolar
+        probe, with the SEQUENTIAL schedule or an int seed as random_state) are cached, and repeating the recall
+        returns them without updating any neurons.  Recalls returning the energies or history are not cached.
         """
+        if schedule not in (SEQUENTIAL, PERMUTATION, RANDOM):
+            raise ValueError("Unrecognized schedule: {0}".format(schedule))
+        index = self.__attractor_index
+        if return_attractor and index is None:
+            raise ValueError("return_attractor requires an attractor index")
+
+        stats = self.__stats
+        start = network_stats.clock() if stats is not None else None
 
-        def hard_limiter(x):
-            """
-            Apply the hard limiting function. F(x) = 1 if x>=0 else, -1
-            :param x: x
-            :return: 1 or -1
-            """
-            return 1 if x >= 0 else -1
+        cache_key = None
+        if self.__recall_cache is not None and not return_energy and not return_history:
+            cache_key = self.__recall_cache_key(v_p, schedule, max_sweeps, random_state, stop_on_energy)
+        if cache_key is not None:
+            cached = self.__recall_cache.get(cache_key)
+            if cached is not None:
+                state, reason = cached
+                attractor = self.__label_attractor(state, reason) if index is not None else None
+                if stats is not None:
+                    stats.recalls += 1
+                    stats.add_time(ASYNCHRONOUS_RECALL, network_stats.clock() - start)
+                return _recall_returns([list(state)], (return_reason, reason), (return_attractor, attractor))
 
-        self.__logger("Using asynchronous recall.")
-        self.__logger("Input vector is: {0}".format(v_p))
+        if schedule != SEQUENTIAL:
+            random_state = check_random_state(random_state)
+        debug = self.__logger.isEnabledFor(logging.DEBUG)
+        trace = self.__trace
+        if debug:
+            self.__logger.debug("Using asynchronous recall.")
+            self.__logger.debug("Input vector is: %s", v_p)
 
         # results to return
-        results = list()
-
-        x_s_prev = v_p
-        converged = False
-        while not converged:
-            x_s = copy.deepcopy(x_s_prev)
-
-            for i, row in enumerate(self.__weight_matrix):
-                self.__logger("Evaluating at neuron [{0}]".format(i))
-                x_i = np.dot(row, np.array([x_s]).transpose())
-                x_i = hard_limiter(x_i)
-                self.__logger("x_s[{0}] updated to {1}".format(i, x_i))
-                x_s[i] = x_i
+        n = self.__num_neurons
+        results = _RecallHistory(n, max_sweeps, return_history)
+
+        tracker = self.__weights.tracker(np.array(v_p, dtype=np.float64))
+        x_s = tracker.x_s
+        field, flip = tracker.field, tracker.flip
+        if index is not None:
+            index = self.__indexed_attractors()
+
+        energies = list()
+
+        reason = MAX_ITERATIONS
+        sweeps = 0
+        total_flips = 0
+        products = 1
+        while max_sweeps is None or sweeps < max_sweeps:
+            if schedule == SEQUENTIAL:
+                order = range(n)
+            elif schedule == PERMUTATION:
+                order = random_state.permutation(n).tolist()
+            else:
+                order = random_state.randint(0, n, size=n).tolist()
+
+            flips = 0
+            for i in order:
+                # Apply the hard limiting function. F(x) = 1 if x>=0 else, -1
+                x_i = 1.0 if field(i) >= 0 else -1.0
+                if x_i != x_s[i]:
+                    flip(i, x_i)
+                    flips += 1
+                    if debug:
+                        self.__logger.debug("x_s[%d] updated to %s", i, x_i)
+                    if trace is not None:
+                        trace(FLIP, sweeps, i)
             results.append(x_s)
+            sweeps += 1
+            total_flips += flips
+            if return_energy:
+                energies.append(self.energy(x_s, tracker.fields))
 
-            self.__logger("x_s: {0}, x_s_prev: {1}".format(x_s, x_s_prev))
-            # Convergence when the state of the neurons (x_s) is unchanged
-            if x_s == x_s_prev:
-                converged = True
+            if debug:
+                self.__logger.debug("x_s: %s, flips: %d", x_s, flips)
+            if trace is not None:
+                trace(SWEEP, sweeps - 1, flips)
+            # Convergence when a sweep leaves the state of the neurons (x_s) unchanged.  Sampling with replacement
+            # may skip neurons in a sweep, so the state is then checked against freshly computed fields.
+            if flips == 0:
+                if schedule != RANDOM:
+                    reason = CONVERGED
+                    break
+                tracker.refresh()
+                products += 1
+                if _fixed_point(x_s, tracker.fields):
+                    reason = CONVERGED
+                    break
+            elif index is not None and index.get(x_s) is not None:
+                # A known attractor is a fixed point, so another sweep would leave it unchanged
+                reason = CONVERGED
+                break
+            elif stop_on_energy:
+                fields = tracker.fields
+                if _energy_minimum(x_s, fields):
+                    reason = CONVERGED if _fixed_point(x_s, fields) else ENERGY_MINIMUM
+                    break
 
-            x_s_prev = x_s
+        if stats is not None:
+            stats.recalls += 1
+            stats.sweeps += sweeps
+            stats.flips += total_flips
+            stats.matvecs += products
+            stats.bytes_allocated += 2 * x_s.nbytes + results.nbytes
+            stats.add_time(ASYNCHRONOUS_RECALL, network_stats.clock() - start)
 
-        return results
+        attractor = self.__label_attractor(results.last, reason) if index is not None and len(results) else None
+        results = results.results()
+        if cache_key is not None and results:
+            self.__recall_cache.put(cache_key, (tuple(results[0]), reason))
+        return _recall_returns(results, (return_reason, reason), (return_energy, np.array(energies)),
+                               (return_attractor, attractor))
+
+    @staticmethod
+    def __recall_cache_key(v_p, schedule, max_sweeps, random_state, stop_on_energy):
+        """
+        Key of an asynchronous recall in the recall cache
+        :return: tuple of the bit-packed probe and the arguments of the recall, or None if the recall is not
+        deterministic and cannot be cached
+        """
+        if schedule != SEQUENTIAL and not isinstance(random_state, (int, long, np.integer)):
+            return None
+        probe = np.asarray(v_p)
+        if not np.all((probe == 1) | (probe == -1)):
+            return None
+        seed = None if schedule == SEQUENTIAL else int(random_state)
+        return bipolar.pack(probe).tobytes(), len(probe), schedule, seed, max_sweeps, stop_on_energy
 
+    def asynchronous_recall_batch(self, probes, max_sweeps=None):
+        """
+        Recall exemplars for many probes at once via asynchronous updating, with the neurons of each sweep updated
+        in index order as by asynchronous_recall with the SEQUENTIAL schedule.  Each single-neuron update is applied
+        to every probe still being updated at once, and each flip updates the local fields of the probes that
+        flipped with one column of W.  Probes left unchanged by a sweep are converged and are masked out of
+        subsequent sweeps.
+        :param probes: (b, n) array (or list of b vectors) of noisy representations of exemplars
+        :param max_sweeps: maximum number of sweeps applied to any probe, or None to sweep until every probe has
+        converged
+        :return: (states, sweeps, converged) - the (b, n) int8 array of final states, the number of sweeps applied
+        to each probe, and whether each probe converged within max_sweeps
+        """
+        stats = self.__stats
+        start = network_stats.clock() if stats is not None else None
+        states = np.array(probes, dtype=np.int8, ndmin=2)
+        assert(states.shape[1] == self.__num_neurons)
+
+        n = self.__num_neurons
+        weights = self.__weights
+        total_flips = 0
+        sweeps = np.zeros(states.shape[0], dtype=np.int64)
+        converged = np.zeros(states.shape[0], dtype=bool)
+
+        # indices of the probes that have not converged yet
+        active = np.arange(states.shape[0])
+        sweep = 0
+        while active.size > 0 and (max_sweeps is None or sweep < max_sweeps):
+            x_s = states[active].astype(np.float64)
+            fields = weights.dot(x_s)
+            flipped = np.zeros(active.size, dtype=bool)
+            for i in range(n):
+                h_i = fields[:, i]
+
+                # Near-ties are decided by the direct product, as by FieldTracker.field
+                for j in np.flatnonzero(np.abs(h_i) < FIELD_TOLERANCE):
+                    h_i[j] = weights.row_dot(i, x_s[j])
+
+                # Apply the hard limiting function. F(x) = 1 if x>=0 else, -1
+                x_i = np.where(h_i >= 0, 1.0, -1.0)
+                changed = np.flatnonzero(x_i != x_s[:, i])
+                if changed.size > 0:
+                    fields[changed] += np.outer(x_i[changed] - x_s[changed, i], weights.column(i))
+                    x_s[changed, i] = x_i[changed]
+                    flipped[changed] = True
+                    total_flips += changed.size
+
+            sweep += 1
+            sweeps[active] += 1
+            states[active] = x_s
+            if stats is not None:
+                stats.matvecs += active.size
+                stats.bytes_allocated += x_s.nbytes + fields.nbytes
+
+            # Convergence when a sweep leaves the state of the neurons (x_s) unchanged
+            converged[active[~flipped]] = True
+            active = active[flipped]
+
+        if stats is not None:
+            stats.recalls += len(states)
+            stats.sweeps += int(sweeps.sum())
+            stats.flips += total_flips
+            stats.bytes_allocated += states.nbytes
+            stats.add_time(BATCH_RECALL, network_stats.clock() - start)
+
+        return states, sweeps, converged
+
+    def energy(self, state, fields=None):
+        """
+        Compute the energy E = -1/2 x^T W x of a state of the network
+        :param state: state vector x
+        :param fields: the local fields Wx of the state, if already known.  Otherwise they are computed.
+        :return: the energy of the state
+        """
+        x_s = np.asarray(state, dtype=np.float64)
+        if fields is None:
+            fields = self.__weights.dot(x_s)
+        return -0.5 * np.dot(x_s, fields)
+
+    def energy_batch(self, states, fields=None):
+        """
+        Compute the energy E = -1/2 x^T W x of each of many states of the network
+        :param states: (b, n) array of states
+        :param fields: (b, n) array of the local fields of the states, if already known.  Otherwise they are
+        computed.
+        :return: (b,) array of energies
+        """
+        x_s = np.array(states, dtype=np.float64, ndmin=2)
+        if fields is None:
+            fields = self.__weights.dot(x_s)
+        return -0.5 * np.einsum('ij,ij->i', x_s, fields)
+
+
+class _RecallHistory(object):
+    """
+    The states visited by a recall.  Only the latest state is kept unless the history is recorded, in which case the
+    states are written to a preallocated int8 array that doubles in size when full.
+    """
+
+    # Maximum number of states initially allocated
+    INITIAL_CAPACITY = 16
+
+    def __init__(self, n, max_steps, record):
+        """
+        :param n: number of neurons
+        :param max_steps: maximum number of states that will be appended, or None if unbounded
+        :param record: keep every state rather than only the latest one?
+        """
+        if not record:
+            capacity = 1
+        elif max_steps is None:
+            capacity = self.INITIAL_CAPACITY
+        else:
+            capacity = max(1, min(max_steps, self.INITIAL_CAPACITY))
+        self.__states = np.empty((capacity, n), dtype=np.int8)
+        self.__record = record
+        self.__count = 0
+
+    def __len__(self):
+        return self.__count
+
+    @property
+    def nbytes(self):
+        """
+        :return: bytes allocated for the states
+        """
+        return self.__states.nbytes
+
+    @property
+    def last(self):
+        """
+        :return: the latest state, as an int8 array
+        """
+        return self.__states[self.__count - 1 if self.__record else 0]
+
+    def append(self, x_s):
+        """
+        :param x_s: state after a step of recall
+        """
+        if not self.__record:
+            self.__states[0] = x_s
+        else:
+            if self.__count == len(self.__states):
+                states = np.empty((2 * len(self.__states), self.__states.shape[1]), dtype=np.int8)
+                states[:self.__count] = self.__states
+                self.__states = states
+            self.__states[self.__count] = x_s
+        self.__count += 1
+
+    def results(self):
+        """
+        :return: the (steps, n) int8 array of recorded states, or otherwise a list holding the latest state as a
+        list
+        """
+        if self.__record:
+            return self.__states[:self.__count]
+        return [self.__states[0].astype(int).tolist()] if self.__count else []
+
+
+def _fixed_point(x_s, fields):
+    """
+    Whether a state is left unchanged by the hard limiting function, given its local fields
+    """
+    return np.array_equal(np.where(fields >= 0, 1.0, -1.0), x_s)
+
+
+def _energy_minimum(x_s, fields):
+    """
+    Whether no single neuron flip can lower the energy of a state, given its local fields.  Flipping neuron i
+    changes the energy by 2 x_i h_i.
+    """
+    return np.all(np.asarray(x_s) * fields >= -FIELD_TOLERANCE)
+
+
+def _batch_stops(x_s, x_s_prev, x_s_prev2):
+    """
+    Find the probes of a batch which stop after an iteration of synchronous recall
+    :param x_s: (b, ...) states after the iteration
+    :param x_s_prev: states before the iteration
+    :param x_s_prev2: states before the previous iteration, or None after the first iteration
+    :return: (unchanged, cycle) - boolean arrays of the probes whose state is unchanged (converged), and of the
+    other probes whose state returned to the one before the previous iteration (a limit cycle of length 2)
+    """
+    unchanged = np.all(x_s == x_s_prev, axis=1)
+    if x_s_prev2 is None:
+        return unchanged, np.zeros_like(unchanged)
+    return unchanged, ~unchanged & np.all(x_s == x_s_prev2, axis=1)
+
+
+def _batch_reasons(converged, cycled):
+    """
+    :param converged: boolean array of the probes of a batch which converged
+    :param cycled: boolean array of the probes which stopped in a cycle
+    :return: object array of the reason each probe stopped
+    """
+    return np.where(converged, CONVERGED, np.where(cycled, CYCLE, MAX_ITERATIONS)).astype(object)
+
+
+def _recall_returns(results, *optional):
+    """
+    Assemble the return value of a recall: the results alone, or a tuple of the results followed by each optional
+    value that was requested
+    :param results: the states visited by the recall
+    :param optional: (requested, value) pairs
+    """
+    values = [value for requested, value in optional if requested]
+    if not values:
+        return results
+    return tuple([results] + values)
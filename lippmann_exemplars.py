@@ -1,6 +1,9 @@
 import copy
+import numpy as np
 import random
 
+from noise import add_noise_batch
+
 
 class LippmanExemplars(object):
     """
@@ -151,6 +154,25 @@ class LippmanExemplars(object):
             self.__exemplar_8
         ])
 
+    # Read-only (8, 120) int8 array of the exemplars in vector form, built on first use by get_bank
+    __bank = None
+
+    @staticmethod
+    def get_bank(as_matrices=False):
+        """
+        The exemplars as a read-only int8 array, built once and shared by every caller
+        :param as_matrices: return a (8, 12, 10) view of the exemplars in their matrix form
+        :return: (8, 120) int8 array of the exemplars in vector form, or its (8, 12, 10) view
+        """
+        if LippmanExemplars.__bank is None:
+            bank = np.array(LippmanExemplars.get_exemplars(), dtype=np.int8)
+            bank.flags.writeable = False
+            LippmanExemplars.__bank = bank
+
+        if as_matrices:
+            return LippmanExemplars.__bank.reshape(-1, 12, 10)
+        return LippmanExemplars.__bank
+
     @staticmethod
     def get_exemplars(as_matrices=False):
         x = LippmanExemplars()
@@ -169,9 +191,14 @@ class LippmanExemplars(object):
     def to_matrix(v_exemplar):
         """
         Convert the vector representation of an exemplar to its 12 x 10 matrix form
-        :param v_exemplar: the vector representation of the exemplar
-        :return: the exemplar as a 12 x 10 matrix
+        :param v_exemplar: the vector representation of the exemplar, or an array of one or more exemplars
+        :return: the exemplar as a 12 x 10 matrix, as a view for arrays
         """
+        if isinstance(v_exemplar, np.ndarray):
+            # A view of the vector, or of each vector of a (k, 120) array
+            assert(v_exemplar.shape[-1] == 120)
+            return v_exemplar.reshape(v_exemplar.shape[:-1] + (12, 10))
+
         assert(len(v_exemplar) == 120)
         return list([
             v_exemplar[0:10],
@@ -192,9 +219,14 @@ class LippmanExemplars(object):
     def to_vector(exemplar):
         """
         Convert the matrix representation of the exemplar to its vector form (100 elements) 
-        :param exemplar: 12x10 matrix form the exemplar
-        :return: a 120 element list representing the vector for that exemplar
+        :param exemplar: 12x10 matrix form the exemplar, or an array of one or more exemplars
+        :return: a 120 element list representing the vector for that exemplar, or a view for arrays
         """
+        if isinstance(exemplar, np.ndarray):
+            # A view of the matrix, or of each matrix of a (k, 12, 10) array
+            assert(exemplar.shape[-2:] == (12, 10))
+            return exemplar.reshape(exemplar.shape[:-2] + (120,))
+
         assert(len(exemplar) == 12)
         return list([col for row in exemplar for col in row])
 
@@ -218,6 +250,21 @@ class LippmanExemplars(object):
         noisy_exemplar = copy.deepcopy(exemplar)
         return [flip_bit(x) for x in noisy_exemplar]
 
+    @staticmethod
+    def add_noise_batch(exemplar, p=.25, count=1, random_state=None, hamming=None):
+        """
+        Make count noisy copies of an exemplar at once, flipping each value with probability p, or exactly hamming
+        values of each copy.  See noise.add_noise_batch.
+        :param exemplar: exemplar to add noise to
+        :param p: probability with which to add noise
+        :param count: number of noisy copies to make
+        :param random_state: None, an int seed or a numpy RandomState to draw the noise from
+        :param hamming: optional exact number of values to flip in each copy
+        :return: (count, n) int8 array of noisy copies of the exemplar
+        """
+        assert(len(exemplar) == 120)
+        return add_noise_batch(exemplar, p=p, count=count, random_state=random_state, hamming=hamming)
+
 
 
 
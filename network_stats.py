@@ -0,0 +1,92 @@
+import timeit
+
+# Phases of work timed by NetworkStats
+TRAINING = 'training'
+SYNCHRONOUS_RECALL = 'synchronous_recall'
+ASYNCHRONOUS_RECALL = 'asynchronous_recall'
+BATCH_RECALL = 'batch_recall'
+PACKED_RECALL = 'packed_recall'
+
+# Clock used to time phases
+clock = timeit.default_timer
+
+
+class NetworkStats(object):
+    """
+    Counts of the work done by a HopfieldNetwork, accumulated while the stats are attached to the network.  Stats
+    from several networks or processes can be aggregated with merge or +, and converted to and from dicts to send them
+    between processes.
+    """
+
+    # Names of the counters
+    COUNTERS = (
+        'exemplars_trained',  # exemplars included in the weights by training
+        'recalls',  # probes recalled
+        'iterations',  # synchronous iterations applied to a probe
+        'sweeps',  # asynchronous sweeps applied to a probe
+        'flips',  # single-neuron flips made by asynchronous recall
+        'matvecs',  # products of the weights with a state vector, counting each row of a batch
+        'bytes_allocated'  # bytes of the state, field and history arrays allocated by recall
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Set every counter and phase time to zero
+        """
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+        self.phase_times = {}
+
+    def add_time(self, phase, seconds):
+        """
+        :param phase: name of the phase
+        :param seconds: wall time spent in the phase
+        """
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def merge(self, other):
+        """
+        Add the counts and phase times of other stats to these
+        :param other: NetworkStats, or a dict from to_dict
+        :return: these stats
+        """
+        if isinstance(other, dict):
+            other = NetworkStats.from_dict(other)
+        for counter in self.COUNTERS:
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        for phase, seconds in other.phase_times.items():
+            self.add_time(phase, seconds)
+        return self
+
+    def __add__(self, other):
+        return NetworkStats().merge(self).merge(other)
+
+    def __radd__(self, other):
+        # Allows sum() of a list of stats
+        if other == 0:
+            return NetworkStats().merge(self)
+        return NetworkStats().merge(other).merge(self)
+
+    def to_dict(self):
+        """
+        :return: dict of the counters and of the phase times
+        """
+        stats = dict((counter, getattr(self, counter)) for counter in self.COUNTERS)
+        stats['phase_times'] = dict(self.phase_times)
+        return stats
+
+    @staticmethod
+    def from_dict(stats):
+        """
+        :param stats: dict from to_dict
+        :return: NetworkStats holding the counts and phase times of the dict
+        """
+        result = NetworkStats()
+        for counter in NetworkStats.COUNTERS:
+            setattr(result, counter, stats.get(counter, 0))
+        for phase, seconds in stats.get('phase_times', {}).items():
+            result.add_time(phase, seconds)
+        return result
@@ -0,0 +1,49 @@
+import numpy as np
+
+from random_state import check_random_state
+
+
+def noise_mask(count, n, p=.25, random_state=None, hamming=None):
+    """
+    Choose the values to flip in count noisy copies of a vector of length n.  Each value is chosen independently
+    with probability p, or, if hamming is given, exactly hamming values chosen uniformly at random are chosen in
+    each copy.
+    :param count: number of noisy copies
+    :param n: length of the vector
+    :param p: probability with which to flip each value.  Ignored if hamming is given.
+    :param random_state: None, an int seed or a numpy RandomState to draw the noise from
+    :param hamming: optional exact number of values to flip in each copy
+    :return: (count, n) bool array, True where a value is flipped
+    """
+    random_state = check_random_state(random_state)
+    if hamming is None:
+        return random_state.random_sample((count, n)) < p
+
+    assert(0 <= hamming <= n)
+
+    # Flip the values with the hamming smallest of n random keys in each copy
+    flips = np.zeros((count, n), dtype=bool)
+    if 0 < hamming < n:
+        keys = random_state.random_sample((count, n))
+        indices = np.argpartition(keys, hamming - 1, axis=1)[:, :hamming]
+        flips[np.arange(count)[:, np.newaxis], indices] = True
+    elif hamming == n:
+        flips[:] = True
+    return flips
+
+
+def add_noise_batch(exemplar, p=.25, count=1, random_state=None, hamming=None):
+    """
+    Make count noisy copies of an exemplar at once.  Each value of each copy is flipped (-1 => 1, 1 => -1)
+    independently with probability p, or, if hamming is given, exactly hamming values chosen uniformly at random are
+    flipped in each copy.
+    :param exemplar: bipolar exemplar vector
+    :param p: probability with which to flip each value.  Ignored if hamming is given.
+    :param count: number of noisy copies to make
+    :param random_state: None, an int seed or a numpy RandomState to draw the noise from
+    :param hamming: optional exact number of values to flip in each copy
+    :return: (count, n) int8 array of noisy copies
+    """
+    exemplar = np.asarray(exemplar, dtype=np.int8)
+    flips = noise_mask(count, len(exemplar), p=p, random_state=random_state, hamming=hamming)
+    return np.where(flips, -exemplar, exemplar)
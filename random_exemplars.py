@@ -1,5 +1,8 @@
+import numpy as np
 import random
 
+from random_state import check_random_state
+
 
 class RandomExemplars(object):
     """
@@ -20,24 +23,84 @@ class RandomExemplars(object):
         # Cannot generate more exemplars than nodes
         assert(num_exemplars <= length)
 
-        if randomize:
-            population = range(0, 2 ** length)
-            samples = random.sample(population, num_exemplars)
+        if randomize and length <= 53:
+            # Sample the population lazily, which selects the same samples as sampling a list of it.  random.sample
+            # picks int(random() * 2 ** length), which is only uniform while random() has a bit for every element.
+            samples = random.sample(xrange(0, 2 ** length), num_exemplars)
+        elif randomize:
+            # Too long to sample uniformly with random(), but also too long for the samples to collide often
+            samples = set()
+            while len(samples) < num_exemplars:
+                samples.add(random.getrandbits(length))
+            samples = list(samples)
         else:
             step = (2 ** length) / num_exemplars
             samples = range(0, 2 ** length, step)
 
         def bipolar_encoding(sample):
-            # convert the binary representation of the sample to bipolar values
-            encoded = [1 if i == '1' else -1 for i in bin(sample)[2:]]
+            # convert the binary representation of the sample, padded up to the required length, to bipolar values
+            return [1 if i == '1' else -1 for i in format(sample, '0{0}b'.format(length))]
 
-            # pad the array up to the required length
-            while len(encoded) < length:
-                encoded.insert(0, -1)
+        return map(bipolar_encoding, samples)
 
-            return encoded
+    @staticmethod
+    def generate(length, num_exemplars, random_state=None):
+        """
+        Draws num_exemplars distinct random bipolar exemplars of length length
+        :param length: length of the vector
+        :param num_exemplars: number of exemplars vectors to generate
+        :param random_state: None, an int seed or a numpy RandomState to draw the exemplars from
+        :return: (num_exemplars, length) int8 array of 1s and -1s
+        """
+        exemplars = np.empty((num_exemplars, length), dtype=np.int8)
+        start = 0
+        for batch in RandomExemplars.generate_batches(length, num_exemplars, max(num_exemplars, 1), random_state):
+            exemplars[start:start + len(batch)] = batch
+            start += len(batch)
+        return exemplars
 
-        return map(bipolar_encoding, samples)
+    @staticmethod
+    def generate_batches(length, num_exemplars, batch_size, random_state=None):
+        """
+        Draws num_exemplars distinct random bipolar exemplars of length length, in batches of batch_size.  Every
+        exemplar is distinct from those in earlier batches, which requires keeping length / 8 bytes for each exemplar
+        drawn so far.
+        :param length: length of the vector
+        :param num_exemplars: number of exemplars vectors to generate
+        :param batch_size: number of exemplars in each batch, other than a smaller final batch
+        :param random_state: None, an int seed or a numpy RandomState to draw the exemplars from
+        :return: generator of (batch_size, length) int8 arrays of 1s and -1s
+        """
+        # Cannot generate more distinct exemplars than there are bipolar vectors of length length
+        assert(length >= 1)
+        assert(num_exemplars <= 2 ** length)
+        assert(batch_size >= 1)
+        random_state = check_random_state(random_state)
+
+        # Exemplars are drawn as random bytes, one bit per element, with the unused bits of the last byte cleared
+        num_bytes = (length + 7) // 8
+        last_byte_mask = (0xFF << (num_bytes * 8 - length)) & 0xFF
+
+        # Bit-packed exemplars drawn so far
+        seen = set()
+
+        remaining = num_exemplars
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            packed = np.empty((size, num_bytes), dtype=np.uint8)
+            filled = 0
+            while filled < size:
+                draws = np.frombuffer(random_state.bytes((size - filled) * num_bytes), dtype=np.uint8)
+                draws = draws.reshape(size - filled, num_bytes).copy()
+                draws[:, -1] &= last_byte_mask
+                for row in draws:
+                    key = row.tobytes()
+                    if key not in seen:
+                        seen.add(key)
+                        packed[filled] = row
+                        filled += 1
+            remaining -= size
+            yield 2 * np.unpackbits(packed, axis=1)[:, :length].astype(np.int8) - 1
 
 
 
@@ -0,0 +1,18 @@
+import numbers
+import numpy as np
+
+
+def check_random_state(seed=None):
+    """
+    Turn a seed into a numpy RandomState instance
+    :param seed: None to use the global numpy random state, an int to seed a new RandomState, or an existing
+    RandomState which is returned as is
+    :return: a numpy RandomState
+    """
+    if seed is None or seed is np.random:
+        return np.random.mtrand._rand
+    if isinstance(seed, (numbers.Integral, np.integer)):
+        return np.random.RandomState(seed)
+    if isinstance(seed, np.random.RandomState):
+        return seed
+    raise ValueError("{0} cannot be used to seed a numpy RandomState".format(seed))
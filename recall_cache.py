@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+
+class RecallCache(object):
+    """
+    Bounded least-recently-used cache of recall results, with counts of hits and misses
+    """
+
+    def __init__(self, max_size=1024):
+        """
+        :param max_size: maximum number of results kept.  The least recently used result is evicted to make room.
+        """
+        assert(max_size >= 1)
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def max_size(self):
+        return self.__max_size
+
+    def get(self, key):
+        """
+        :param key: key of a result
+        :return: the cached result, or None if it is not cached
+        """
+        value = self.__entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+
+        # Reinsert the result as the most recently used
+        self.__entries[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Cache a result, evicting the least recently used result if the cache is full
+        :param key: key of the result
+        :param value: the result, which must not be None
+        """
+        self.__entries.pop(key, None)
+        if len(self.__entries) >= self.__max_size:
+            self.__entries.popitem(last=False)
+        self.__entries[key] = value
+
+    def clear(self):
+        """
+        Discard every cached result, keeping the hit and miss counts
+        """
+        self.__entries.clear()
+
+    def reset_stats(self):
+        """
+        Set the hit and miss counts to zero
+        """
+        self.hits = 0
+        self.misses = 0
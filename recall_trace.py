@@ -0,0 +1,47 @@
+import array
+import numpy as np
+
+# Codes of the events a HopfieldNetwork sends to its trace sink, each with two integer values
+# (EXEMPLAR_ADDED, exemplar index, 0) - Storkey learning has included an exemplar
+EXEMPLAR_ADDED = 0
+# (ITERATION, iteration, number of neurons changed) - synchronous recall has completed an iteration
+ITERATION = 1
+# (FLIP, sweep, neuron index) - asynchronous recall has flipped a neuron
+FLIP = 2
+# (SWEEP, sweep, number of flips) - asynchronous recall has completed a sweep
+SWEEP = 3
+
+
+class TraceBuffer(object):
+    """
+    Trace sink which records the events of a HopfieldNetwork as integers, three per event, in a growable buffer.
+    Pass an instance as the trace of a network.
+    """
+
+    def __init__(self):
+        self.__buffer = array.array('l')
+
+    def __call__(self, event, a, b):
+        """
+        Record an event
+        :param event: event code
+        :param a: first value of the event
+        :param b: second value of the event
+        """
+        self.__buffer.extend((event, a, b))
+
+    def __len__(self):
+        return len(self.__buffer) // 3
+
+    @property
+    def events(self):
+        """
+        :return: (m, 3) int64 array of the recorded events, each a row of event code and its two values
+        """
+        return np.array(self.__buffer, dtype=np.int64).reshape(-1, 3)
+
+    def clear(self):
+        """
+        Discard the recorded events
+        """
+        self.__buffer = array.array('l')
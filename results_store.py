@@ -0,0 +1,106 @@
+import json
+import os
+
+
+class ResultsStore(object):
+    """
+    Append-only store of experiment records in a JSON Lines file, one record per line.  Records are buffered and
+    written in batches.  Opening an existing file loads the records already written to it, so an interrupted
+    experiment can skip the work it has already done.
+    """
+
+    def __init__(self, path, key_fields=('n', 'k', 'trial', 'learning_rule', 'seed'), batch_size=100):
+        """
+        Open a store, loading any records already written to path
+        :param path: path of the JSON Lines file, which is created if it does not exist
+        :param key_fields: fields of a record which identify the work it records
+        :param batch_size: number of records buffered before they are written to the file
+        """
+        assert(batch_size >= 1)
+        self.__path = path
+        self.__key_fields = tuple(key_fields)
+        self.__batch_size = batch_size
+        self.__records = []
+        self.__keys = set()
+        self.__buffer = []
+
+        # Start the next write on a new line if the file ends with a partially written record
+        self.__needs_newline = False
+
+        if os.path.exists(path):
+            with open(path) as records_file:
+                for line in records_file:
+                    self.__needs_newline = not line.endswith('\n')
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A line left partially written by an interrupted write
+                        continue
+                    self.__records.append(record)
+                    self.__keys.add(self.key(record))
+
+    def key(self, record):
+        """
+        :param record: record dict
+        :return: tuple of the values of the key fields of the record
+        """
+        return tuple(record[field] for field in self.__key_fields)
+
+    def __contains__(self, key):
+        """
+        :param key: tuple of the values of the key fields
+        :return: has a record with this key been added to the store?
+        """
+        return tuple(key) in self.__keys
+
+    def __len__(self):
+        return len(self.__records)
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def records(self):
+        """
+        :return: list of the records in the store, including buffered records which are yet to be written
+        """
+        return list(self.__records)
+
+    def add(self, record):
+        """
+        Add a record, writing the buffered records to the file once there are batch_size of them
+        :param record: JSON serializable dict holding at least the key fields
+        """
+        self.__records.append(record)
+        self.__keys.add(self.key(record))
+        self.__buffer.append(json.dumps(record, sort_keys=True))
+        if len(self.__buffer) >= self.__batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the buffered records to the file
+        """
+        if not self.__buffer:
+            return
+        with open(self.__path, 'a') as records_file:
+            if self.__needs_newline:
+                records_file.write('\n')
+                self.__needs_newline = False
+            records_file.write('\n'.join(self.__buffer) + '\n')
+            records_file.flush()
+            os.fsync(records_file.fileno())
+        self.__buffer = []
+
+    def close(self):
+        """
+        Write any buffered records
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,33 @@
+import numpy as np
+import unittest
+
+from attractor_index import AttractorIndex, EXEMPLAR, SPURIOUS
+
+
+class TestAttractorIndex(unittest.TestCase):
+    """
+    Test the index of known attractors
+    """
+
+    def test_add_get(self):
+        exemplars = np.array([[1, -1, 1, -1], [1, 1, -1, -1], [1, -1, 1, -1]], dtype=np.int8)
+        index = AttractorIndex()
+        index.add_exemplars(exemplars, np.array([True, False, True]))
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get([1, -1, 1, -1]), (EXEMPLAR, 0))
+        self.assertTrue(index.get([1, 1, -1, -1]) is None)
+
+        self.assertEqual(index.add_spurious([-1, -1, 1, 1]), (SPURIOUS, 0))
+        self.assertEqual(index.add_spurious(np.array([-1., -1., 1., 1.])), (SPURIOUS, 0))
+        self.assertEqual(index.add_spurious([1, -1, 1, -1]), (EXEMPLAR, 0))
+        self.assertEqual(index.get(np.array([-1., -1., 1., 1.])), (SPURIOUS, 0))
+        np.testing.assert_equal(index.spurious, [[-1, -1, 1, 1]])
+
+        index.clear()
+        self.assertEqual(len(index), 0)
+        self.assertTrue(index.get([1, -1, 1, -1]) is None)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestAttractorIndex)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,61 @@
+import json
+import numpy as np
+import unittest
+
+from benchmarks import BENCHMARKS, benchmark_cases, compare, run_case
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Test the benchmark suite
+    """
+
+    def test_benchmark_cases(self):
+        cases = benchmark_cases()
+        self.assertTrue(set(name for name, _ in cases) == set(BENCHMARKS))
+        self.assertTrue(len(benchmark_cases(quick=True)) < len(cases))
+
+        # k varies on its own at a fixed n, for training and recall
+        for name in ['train', 'synchronous_recall', 'asynchronous_recall_batch']:
+            ks = set(params['k'] for case_name, params in cases if case_name == name and params['n'] == 400)
+            self.assertEqual(ks, set([20, 40, 80]))
+        self.assertEqual(len(set(json.dumps(case, sort_keys=True) for case in cases)), len(cases))
+
+    def test_run_case(self):
+        result = run_case(('synchronous_recall_batch', {'n': 50, 'k': 5, 'batch': 8, 'storage': 'dense'}), repeat=1)
+        self.assertEqual(result['name'], 'synchronous_recall_batch')
+        self.assertEqual(result['unit'], 'probes')
+        self.assertTrue(result['seconds'] > 0)
+        self.assertAlmostEqual(result['throughput'], 8 / result['seconds'])
+        self.assertAlmostEqual(result['neurons_per_second'], 8 * 50 / result['seconds'])
+        self.assertTrue(result['peak_memory_kb'] >= 0)
+
+    def test_run_case_memory(self):
+        # Memory held before the case, as by the parent of a forked worker, is not reported as the case's
+        held = np.ones(25 * 1024 * 1024 // 8)
+        result = run_case(('add_noise_batch', {'n': 100, 'batch': 16}), repeat=1)
+        self.assertTrue(result['peak_memory_kb'] < 10 * 1024)
+        del held
+
+        # Memory the case allocates is
+        result = run_case(('synchronous_recall_batch', {'n': 1000, 'k': 5, 'batch': 1000, 'storage': 'dense'}),
+                          repeat=1)
+        self.assertTrue(result['peak_memory_kb'] > 1000 * 1000 * 8 // 1024)
+
+    def test_compare(self):
+        baseline = {'results': [
+            {'name': 'train', 'params': {'n': 10}, 'seconds': 1.0},
+            {'name': 'train', 'params': {'n': 20}, 'seconds': 1.0}
+        ]}
+        benchmarks = {'results': [
+            {'name': 'train', 'params': {'n': 10}, 'seconds': 1.05},
+            {'name': 'train', 'params': {'n': 20}, 'seconds': 1.5},
+            {'name': 'train', 'params': {'n': 30}, 'seconds': 9.0}
+        ]}
+        self.assertEqual(compare(benchmarks, baseline), [('train', {'n': 20}, 1.5, 1.0)])
+        self.assertEqual(len(compare(benchmarks, baseline, threshold=.01)), 2)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBenchmarks)
+    unittest.TextTestRunner(verbosity=2).run(suite)
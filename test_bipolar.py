@@ -0,0 +1,38 @@
+import numpy as np
+import numpy.testing as npt
+import unittest
+
+import bipolar
+
+
+class TestBipolar(unittest.TestCase):
+    """
+    Test the bit-packed representation of bipolar vectors
+    """
+
+    def test_pack_unpack(self):
+        states = [[1, -1, -1, 1, 1], [-1, -1, -1, -1, 1]]
+        packed = bipolar.pack(states)
+        self.assertEqual(packed.dtype, np.uint64)
+        self.assertEqual(packed.shape, (2, 1))
+        self.assertEqual(bipolar.unpack(packed, 5).tolist(), states)
+
+        # Vectors spanning several words
+        random_state = np.random.RandomState(11)
+        states = np.where(random_state.rand(3, 150) < .5, 1, -1)
+        packed = bipolar.pack(states)
+        self.assertEqual(packed.shape, (3, 3))
+        npt.assert_equal(bipolar.unpack(packed, 150), states)
+
+    def test_overlaps(self):
+        random_state = np.random.RandomState(12)
+        a = np.where(random_state.rand(4, 70) < .5, 1, -1)
+        b = np.where(random_state.rand(3, 70) < .5, 1, -1)
+        npt.assert_equal(bipolar.hamming(bipolar.pack(a), bipolar.pack(b)),
+                         [[np.sum(x != y) for y in b] for x in a])
+        npt.assert_equal(bipolar.overlaps(bipolar.pack(a), bipolar.pack(b), 70), np.dot(a, b.T))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBipolar)
+    unittest.TextTestRunner(verbosity=2).run(suite)
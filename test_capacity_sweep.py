@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from capacity_sweep import run_capacity_sweep
+from results_store import ResultsStore
+
+
+class TestCapacitySweep(unittest.TestCase):
+    """
+    Test the capacity sweep runner
+    """
+
+    def test_run_capacity_sweep(self):
+        results, capacities = run_capacity_sweep(sizes=[5, 6], num_trials=3, seed=1234, processes=1)
+        self.assertEqual(sorted(results), [5, 6])
+        self.assertEqual([entry['k'] for entry in results[6]], [1, 2, 3, 4, 5])
+        for n in results:
+            self.assertEqual(sorted(capacities[n]), ['hebbian', 'storkey'])
+            for entry in results[n]:
+                self.assertTrue(0 <= entry['hebbian'] <= 1)
+                self.assertTrue(0 <= entry['storkey'] <= 1)
+
+        # A single exemplar is always recalled
+        self.assertEqual(results[5][0]['hebbian'], 0)
+        self.assertEqual(results[5][0]['storkey'], 0)
+
+    def test_run_capacity_sweep_processes(self):
+        """
+        The results do not depend on the number of processes running the trials
+        """
+        serial = run_capacity_sweep(sizes=[5, 7], num_trials=2, seed=99, processes=1)
+        pooled = run_capacity_sweep(sizes=[5, 7], num_trials=2, seed=99, processes=2, chunk_size=3)
+        self.assertEqual(serial, pooled)
+
+    def test_run_capacity_sweep_resume(self):
+        """
+        A sweep with a results store records every trial, and a resumed sweep only runs the trials not yet recorded
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'sweep.jsonl')
+            expected = run_capacity_sweep(sizes=[5, 6], num_trials=2, seed=7, processes=1)
+
+            with ResultsStore(path, batch_size=4) as store:
+                run_capacity_sweep(sizes=[5], num_trials=2, seed=7, processes=1, store=store)
+                self.assertEqual(len(store), 4 * 2 * 2)
+
+            store = ResultsStore(path)
+            self.assertEqual(run_capacity_sweep(sizes=[5, 6], num_trials=2, seed=7, processes=1, store=store),
+                             expected)
+            self.assertEqual(len(store), (4 + 5) * 2 * 2)
+            store.close()
+
+            store = ResultsStore(path)
+            self.assertEqual(len(store), (4 + 5) * 2 * 2)
+            self.assertEqual(run_capacity_sweep(sizes=[5, 6], num_trials=2, seed=7, processes=1, store=store),
+                             expected)
+            self.assertEqual(len(store), (4 + 5) * 2 * 2)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestCapacitySweep)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,53 @@
+import numpy as np
+import numpy.testing as npt
+import unittest
+
+from evaluation import evaluate_recall
+from hopfield_network import HopfieldNetwork
+from lippmann_exemplars import LippmanExemplars
+from noise import add_noise_batch
+
+
+class TestEvaluation(unittest.TestCase):
+    """
+    Test the batched noise-robustness evaluation
+    """
+
+    def test_evaluate_recall(self):
+        exemplars = LippmanExemplars.get_bank()[:4]
+        network = HopfieldNetwork(exemplars, learning_rule="Storkey")
+        evaluation = evaluate_recall(network, exemplars, [0, .1, .25], trials=20, chunk_size=16, random_state=1234)
+        self.assertEqual(evaluation['noise_levels'], [0, .1, .25])
+        self.assertEqual(evaluation['error_rates'].shape, (3, 4))
+        self.assertEqual(evaluation['hamming_distances'].shape, (3, 4))
+        npt.assert_equal(evaluation['error_rates'][0], 0)
+        npt.assert_equal(evaluation['hamming_distances'][0], 0)
+        npt.assert_almost_equal(evaluation['level_error_rates'], evaluation['error_rates'].mean(axis=1))
+        self.assertTrue(np.all(evaluation['hamming_distances'][evaluation['error_rates'] == 0] == 0))
+
+        # Chunking does not change the probes
+        unchunked = evaluate_recall(network, exemplars, [0, .1, .25], trials=20, chunk_size=1000, random_state=1234)
+        npt.assert_equal(unchunked['error_rates'], evaluation['error_rates'])
+        npt.assert_equal(unchunked['hamming_distances'], evaluation['hamming_distances'])
+
+    def test_evaluate_recall_matches_recall(self):
+        """
+        The error rates and Hamming distances match those of recalling each probe in isolation
+        """
+        exemplars = LippmanExemplars.get_bank()[:3]
+        network = HopfieldNetwork(exemplars, learning_rule="Hebb")
+        evaluation = evaluate_recall(network, exemplars, [30], trials=10, random_state=99, hamming=True)
+
+        random_state = np.random.RandomState(99)
+        probes = np.concatenate([add_noise_batch(exemplar, count=10, random_state=random_state, hamming=30)
+                                 for exemplar in exemplars])
+        for i, exemplar in enumerate(exemplars):
+            states = [network.asynchronous_recall(probe)[-1] for probe in probes[10 * i:10 * (i + 1)]]
+            distances = np.sum(np.array(states) != exemplar, axis=1)
+            self.assertAlmostEqual(evaluation['error_rates'][0, i], np.mean(distances > 0))
+            self.assertAlmostEqual(evaluation['hamming_distances'][0, i], np.mean(distances))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestEvaluation)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -1,6 +1,10 @@
+import numpy as np
+import numpy.testing as npt
 import unittest
 
 from exemplars import Exemplars
+from hopfield_network import HopfieldNetwork
+from lippmann_exemplars import LippmanExemplars
 
 
 class TestExemplars(unittest.TestCase):
@@ -46,6 +50,40 @@ class TestExemplars(unittest.TestCase):
             [-1, -1, -1, -1, -1, -1, -1, -1, -1, 1],
         ])
 
+    def test_get_bank(self):
+        """
+        The exemplar banks are cached read-only arrays, with matrix forms that are views of them
+        """
+        for exemplars, rows in [(Exemplars, 10), (LippmanExemplars, 12)]:
+            bank = exemplars.get_bank()
+            self.assertEqual(bank.shape, (8, rows * 10))
+            self.assertEqual(bank.dtype, np.int8)
+            self.assertFalse(bank.flags.writeable)
+            self.assertTrue(exemplars.get_bank() is bank)
+            npt.assert_equal(bank, exemplars.get_exemplars())
+
+            matrices = exemplars.get_bank(as_matrices=True)
+            npt.assert_equal(matrices, exemplars.get_exemplars(as_matrices=True))
+            self.assertTrue(np.may_share_memory(matrices, bank))
+
+            # Conversions of arrays are views
+            self.assertTrue(np.may_share_memory(exemplars.to_matrix(bank[2]), bank))
+            npt.assert_equal(exemplars.to_matrix(bank[2]), exemplars.to_matrix(exemplars.get_exemplars()[2]))
+            npt.assert_equal(exemplars.to_matrix(bank), matrices)
+            npt.assert_equal(exemplars.to_vector(matrices[2]), bank[2])
+            npt.assert_equal(exemplars.to_vector(matrices), bank)
+
+    def test_bank_network(self):
+        """
+        Networks train and recall from the bank as they do from lists
+        """
+        bank = Exemplars.get_bank()
+        for learning_rule in ["Hebb", "Storkey"]:
+            network = HopfieldNetwork(bank, learning_rule=learning_rule)
+            expected = HopfieldNetwork(Exemplars.get_exemplars(), learning_rule=learning_rule)
+            npt.assert_equal(network.weight_matrix, expected.weight_matrix)
+            npt.assert_equal(network.asynchronous_recall(bank[1]), expected.asynchronous_recall(bank[1].tolist()))
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestExemplars)
@@ -1,8 +1,64 @@
+import logging
 import numpy as np
 import numpy.testing as npt
+import os
+import random
+import shutil
+import tempfile
 import unittest
 
-from hopfield_network import HopfieldNetwork
+import bipolar
+import hopfield_network
+import network_stats
+import recall_trace
+from attractor_index import AttractorIndex, EXEMPLAR, SPURIOUS
+from hopfield_network import HopfieldNetwork, CONVERGED, CYCLE, MAX_ITERATIONS, PERMUTATION, RANDOM, FLOAT32, SCALED, \
+    PACKED, OVERLAP, _RecallHistory
+from network_stats import NetworkStats, TRAINING, SYNCHRONOUS_RECALL, ASYNCHRONOUS_RECALL, BATCH_RECALL
+from recall_trace import TraceBuffer
+
+
+def storkey_reference(v_exemplars):
+    """
+    Element-by-element Storkey Learning Rule, used as the reference for the vectorized training path
+    :param v_exemplars: list of exemplars
+    :return: the weight matrix
+    """
+    n = len(v_exemplars[0])
+    w = np.zeros(shape=(n, n))
+
+    def h(i, j, e):
+        return sum([w[i][k] * e[k] for k in range(1, n) if k != i and k != j])
+
+    for e in v_exemplars:
+        w_v = np.zeros(shape=(n, n))
+        for i in range(n):
+            for j in range(n):
+                if i == j:
+                    continue
+                w_v[i][j] = w[i][j] + (1.0 / n) * (e[i] * e[j] - e[i] * h(j, i, e) - h(i, j, e) * e[j])
+        w = w_v
+    return w
+
+
+def asynchronous_reference(weight_matrix, v_p):
+    """
+    Asynchronous recall evaluating every neuron with a direct dot product, used as the reference for the
+    incremental-field recall
+    :param weight_matrix: weight matrix of the network
+    :param v_p: noisy vector to recall from
+    :return: the state after each sweep
+    """
+    results = []
+    x_s_prev = list(v_p)
+    while True:
+        x_s = list(x_s_prev)
+        for i, row in enumerate(weight_matrix):
+            x_s[i] = 1 if np.dot(row, np.array([x_s]).transpose()) >= 0 else -1
+        results.append(x_s)
+        if x_s == x_s_prev:
+            return results
+        x_s_prev = x_s
 
 
 class TestHopfieldNetwork(unittest.TestCase):
@@ -72,6 +128,41 @@ class TestHopfieldNetwork(unittest.TestCase):
         ])
         npt.assert_equal(network.weight_matrix, expected)
 
+    def test_init_hebbian_chunked(self):
+        """
+        Training in chunks of exemplars gives the same weights as a single product
+        """
+        random.seed(4321)
+        v_exemplars = [[random.choice([-1, 1]) for _ in range(16)] for _ in range(7)]
+        network = HopfieldNetwork(v_exemplars, learning_rule="Hebb")
+        chunked = HopfieldNetwork(v_exemplars, learning_rule="Hebb", chunk_size=3)
+        npt.assert_almost_equal(chunked.weight_matrix, network.weight_matrix)
+
+        expected = sum(np.outer(e, e) for e in v_exemplars) / 16.0
+        np.fill_diagonal(expected, 0)
+        npt.assert_almost_equal(network.weight_matrix, expected)
+
+    def test_add_forget_exemplars_hebbian(self):
+        """
+        Adding exemplars matches training on all of them, and forgetting them restores the weights exactly
+        """
+        random_state = np.random.RandomState(21)
+        v_exemplars = np.where(random_state.rand(6, 30) < .5, 1, -1).tolist()
+        for storage in ["dense", OVERLAP]:
+            network = HopfieldNetwork(v_exemplars[:4], learning_rule="Hebb", storage=storage)
+            weight_matrix = network.weight_matrix.copy()
+
+            network.add_exemplars(v_exemplars[4:])
+            self.assertEqual(network.num_exemplars, 6)
+            npt.assert_almost_equal(network.weight_matrix,
+                                    HopfieldNetwork(v_exemplars, learning_rule="Hebb").weight_matrix)
+
+            network.forget_exemplars(v_exemplars[4:])
+            self.assertEqual(network.num_exemplars, 4)
+            npt.assert_equal(network.weight_matrix, weight_matrix)
+
+            self.assertRaises(ValueError, network.forget_exemplars, [v_exemplars[5]])
+
     def test_perfect_recall_hebbian(self):
         """
         Recall a reconstructed exemplar using a perfect exemplar
@@ -97,6 +188,171 @@ class TestHopfieldNetwork(unittest.TestCase):
         npt.assert_equal(p, v_two)
 
 
+    def test_synchronous_recall_stop_reason(self):
+        """
+        Synchronous recall reports convergence, 2-cycles and the iteration cap
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Hebb")
+        results, reason = network.synchronous_recall(v_one, return_reason=True)
+        self.assertEqual(results, [v_one])
+        self.assertEqual(reason, CONVERGED)
+
+        # [1, 1] -> [-1, -1] -> [1, 1] -> ...
+        network = HopfieldNetwork([[1, -1]], learning_rule="Hebb")
+        results, reason = network.synchronous_recall([1, 1], return_reason=True, return_history=True)
+        npt.assert_equal(results, [[-1, -1], [1, 1]])
+        self.assertEqual(reason, CYCLE)
+
+        results, reason = network.synchronous_recall([1, 1], max_iterations=1, return_reason=True)
+        self.assertEqual(results, [[-1, -1]])
+        self.assertEqual(reason, MAX_ITERATIONS)
+
+    def test_synchronous_recall_batch(self):
+        """
+        Recall several probes at once under synchronous updating
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        v_three = [-1, -1, 1, -1, -1, 1, -1, -1, 1]
+        network = HopfieldNetwork([v_one, v_two, v_three], learning_rule="Storkey")
+
+        probes = [v_one, v_two, [1, -1, 1, -1, -1, 1, -1, 1, 1]]
+        states, iterations, converged = network.synchronous_recall_batch(probes)
+        self.assertEqual(states.dtype, np.int8)
+        npt.assert_equal(states, [v_one, v_two, v_three])
+        npt.assert_equal(iterations, [1, 1, 4])
+        npt.assert_equal(converged, [True, True, True])
+
+        # Each probe matches its recall in isolation
+        for probe, state in zip(probes, states):
+            npt.assert_equal(state, network.synchronous_recall(probe)[-1])
+
+        # Probes stuck in a cycle stop as they do in isolation, whatever the parity of max_iterations
+        network = HopfieldNetwork([[1, -1]])
+        probes = [[1, 1], [1, -1]]
+        for max_iterations in [3, 4]:
+            states, iterations, converged, reasons = network.synchronous_recall_batch(probes, max_iterations,
+                                                                                      return_reasons=True)
+            results, reason = network.synchronous_recall([1, 1], max_iterations, return_reason=True)
+            npt.assert_equal(states, [results[-1], [1, -1]])
+            npt.assert_equal(iterations, [2, 1])
+            npt.assert_equal(converged, [False, True])
+            self.assertEqual(list(reasons), [CYCLE, CONVERGED])
+            self.assertEqual(reason, CYCLE)
+
+            packed = network.packed_recall(bipolar.pack(probes), max_iterations, return_reasons=True)
+            npt.assert_equal(bipolar.unpack(packed[0], 2), states)
+            for actual, expected in zip(packed[1:], (iterations, converged, reasons)):
+                npt.assert_equal(actual, expected)
+        _, _, _, reasons = network.synchronous_recall_batch([[1, 1]], 1, return_reasons=True)
+        self.assertEqual(list(reasons), [MAX_ITERATIONS])
+
+    def test_asynchronous_recall_batch(self):
+        """
+        Recall several probes at once under asynchronous updating matches recall of each probe in isolation
+        """
+        random_state = np.random.RandomState(1234)
+        v_exemplars = np.where(random_state.rand(6, 40) < .5, 1, -1).tolist()
+        probes = np.where(random_state.rand(25, 40) < .5, 1, -1)
+        probes[:6] = v_exemplars
+        for learning_rule, storage in [("Hebb", "dense"), ("Hebb", SCALED), ("Hebb", PACKED), ("Hebb", OVERLAP),
+                                       ("Storkey", "dense")]:
+            network = HopfieldNetwork(v_exemplars, learning_rule=learning_rule, storage=storage)
+            states, sweeps, converged = network.asynchronous_recall_batch(probes)
+            self.assertEqual(states.dtype, np.int8)
+            self.assertTrue(np.all(converged))
+            for probe, state, probe_sweeps in zip(probes, states, sweeps):
+                results = network.asynchronous_recall(probe, return_history=True)
+                npt.assert_equal(state, results[-1])
+                self.assertEqual(probe_sweeps, len(results))
+
+        states, sweeps, converged = network.asynchronous_recall_batch(probes, max_sweeps=1)
+        npt.assert_equal(sweeps, 1)
+        for probe, state, probe_converged in zip(probes, states, converged):
+            results, reason = network.asynchronous_recall(probe, max_sweeps=1, return_reason=True)
+            npt.assert_equal(state, results[-1])
+            self.assertEqual(probe_converged, reason == CONVERGED)
+
+    def test_packed_recall(self):
+        """
+        Recall from bit-packed probes matches synchronous recall on the weight matrix
+        """
+        # With an even number of neurons and an odd number of exemplars no local field is zero, so the outcome
+        # does not depend on round-off in the weight matrix
+        random_state = np.random.RandomState(99)
+        v_exemplars = np.where(random_state.rand(5, 100) < .5, 1, -1)
+        network = HopfieldNetwork(v_exemplars.tolist(), learning_rule="Hebb")
+
+        probes = np.where(random_state.rand(30, 100) < .5, 1, -1)
+        probes[:5] = v_exemplars
+        states, iterations, converged = network.packed_recall(bipolar.pack(probes))
+        expected_states, expected_iterations, expected_converged = network.synchronous_recall_batch(probes)
+        npt.assert_equal(bipolar.unpack(states, 100), expected_states)
+        npt.assert_equal(iterations, expected_iterations)
+        npt.assert_equal(converged, expected_converged)
+
+        # Recalling in chunks gives the same results
+        for actual, expected in zip(network.packed_recall(bipolar.pack(probes), chunk_size=7),
+                                    (states, iterations, converged)):
+            npt.assert_equal(actual, expected)
+
+        network = HopfieldNetwork(v_exemplars.tolist(), learning_rule="Storkey")
+        self.assertRaises(ValueError, network.packed_recall, bipolar.pack(probes))
+
+    def test_overlap_storage(self):
+        """
+        A Hebbian network storing only its exemplars recalls as one storing the weight matrix
+        """
+        random_state = np.random.RandomState(5)
+        v_exemplars = np.where(random_state.rand(5, 60) < .5, 1, -1).tolist()
+        dense = HopfieldNetwork(v_exemplars, learning_rule="Hebb")
+        overlap = HopfieldNetwork(v_exemplars, learning_rule="Hebb", storage=OVERLAP)
+        self.assertEqual(overlap.storage, OVERLAP)
+        npt.assert_almost_equal(overlap.weight_matrix, dense.weight_matrix)
+
+        probes = np.where(random_state.rand(10, 60) < .5, 1, -1)
+        for probe in probes.tolist():
+            self.assertEqual(overlap.asynchronous_recall(probe), dense.asynchronous_recall(probe))
+            self.assertEqual(overlap.synchronous_recall(probe), dense.synchronous_recall(probe))
+            self.assertAlmostEqual(overlap.energy(probe), dense.energy(probe))
+        for actual, expected in zip(overlap.synchronous_recall_batch(probes), dense.synchronous_recall_batch(probes)):
+            npt.assert_equal(actual, expected)
+
+        self.assertRaises(ValueError, HopfieldNetwork, v_exemplars, learning_rule="Storkey", storage=OVERLAP)
+        self.assertRaises(ValueError, HopfieldNetwork, v_exemplars, learning_rule="Oja")
+
+    def test_compact_storage(self):
+        """
+        Networks storing their weights in float32, as scaled integers, or packed recall as one storing the float64
+        weight matrix
+        """
+        random_state = np.random.RandomState(6)
+        v_exemplars = np.where(random_state.rand(5, 60) < .5, 1, -1).tolist()
+        probes = np.where(random_state.rand(10, 60) < .5, 1, -1)
+        for learning_rule, storages in [("Hebb", [FLOAT32, SCALED, PACKED]), ("Storkey", [FLOAT32, PACKED])]:
+            dense = HopfieldNetwork(v_exemplars, learning_rule=learning_rule)
+            for storage in storages:
+                network = HopfieldNetwork(v_exemplars, learning_rule=learning_rule, storage=storage)
+                self.assertEqual(network.storage, storage)
+                self.assertTrue(network.weights_nbytes < dense.weights_nbytes)
+                npt.assert_almost_equal(network.weight_matrix, dense.weight_matrix, decimal=6)
+
+                for probe in probes.tolist():
+                    self.assertEqual(network.asynchronous_recall(probe), dense.asynchronous_recall(probe))
+                    self.assertEqual(network.synchronous_recall(probe), dense.synchronous_recall(probe))
+                npt.assert_equal(network.synchronous_recall_batch(probes)[0], dense.synchronous_recall_batch(probes)[0])
+
+        self.assertRaises(ValueError, HopfieldNetwork, v_exemplars, learning_rule="Storkey", storage=SCALED)
+
+        # Scaled integer weights are exact, so adding and forgetting exemplars keeps them equal to retraining
+        network = HopfieldNetwork(v_exemplars[:2], learning_rule="Hebb", storage=SCALED)
+        network.add_exemplars(v_exemplars[2:])
+        network.forget_exemplars([v_exemplars[0]])
+        npt.assert_equal(network.weight_matrix, HopfieldNetwork(v_exemplars[1:], learning_rule="Hebb",
+                                                                storage=SCALED).weight_matrix)
+
     @unittest.skip("Example from Module 8.3. Won't recall correctly under synchronous modality.")
     def test_noisy_synchronous_recall_hebbian(self):
         """
@@ -132,6 +388,423 @@ class TestHopfieldNetwork(unittest.TestCase):
         p = results[-1]
         npt.assert_equal(p, v_two)
 
+    def test_asynchronous_recall_matches_reference(self):
+        """
+        The incremental-field asynchronous recall visits the same states as direct evaluation
+        """
+        random.seed(2468)
+        for learning_rule in ["Hebb", "Storkey"]:
+            v_exemplars = [[random.choice([-1, 1]) for _ in range(24)] for _ in range(4)]
+            network = HopfieldNetwork(v_exemplars, learning_rule=learning_rule)
+            for _ in range(20):
+                v_p = [random.choice([-1, 1]) for _ in range(24)]
+                npt.assert_equal(network.asynchronous_recall(v_p, return_history=True),
+                                 asynchronous_reference(network.weight_matrix, v_p))
+
+    def test_asynchronous_recall_schedules(self):
+        """
+        Recall under random update orders is reproducible for a given seed and reaches the exemplar
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Hebb")
+        v_p = [-1, -1, -1, 1, 1, 1, -1, 1, -1]
+
+        for schedule in [PERMUTATION, RANDOM]:
+            results, reason = network.asynchronous_recall(v_p, schedule=schedule, random_state=7, return_reason=True)
+            self.assertEqual(results[-1], v_two)
+            self.assertEqual(reason, CONVERGED)
+            npt.assert_equal(network.asynchronous_recall(v_p, schedule=schedule, random_state=7, return_history=True),
+                             network.asynchronous_recall(v_p, schedule=schedule, random_state=7, return_history=True))
+
+        self.assertRaises(ValueError, network.asynchronous_recall, v_p, schedule="backwards")
+
+    def test_recall_history(self):
+        """
+        Recall returns only the final state unless the history is requested as an int8 array
+        """
+        random.seed(1357)
+        v_exemplars = [[random.choice([-1, 1]) for _ in range(30)] for _ in range(3)]
+        network = HopfieldNetwork(v_exemplars, learning_rule="Hebb")
+        v_p = list(v_exemplars[0])
+        v_p[:8] = [-x for x in v_p[:8]]
+
+        for recall in [network.synchronous_recall, network.asynchronous_recall]:
+            history = recall(v_p, return_history=True)
+            self.assertEqual(history.dtype, np.int8)
+            self.assertEqual(history.shape[1], 30)
+            results = recall(v_p)
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[-1], history[-1].tolist())
+
+        # The history grows beyond its initial allocation
+        states = np.where(np.random.RandomState(5).rand(40, 30) < .5, 1, -1)
+        history = _RecallHistory(30, None, True)
+        for state in states:
+            history.append(state)
+        npt.assert_equal(history.results(), states)
+        npt.assert_equal(history.last, states[-1])
+
+    def test_debug_logging(self):
+        """
+        Debug output goes to the hopfield_network logger, and nothing is logged unless it is enabled for DEBUG
+        """
+        records = []
+
+        class ListHandler(logging.Handler):
+            def emit(self, record):
+                records.append(record.getMessage())
+
+        handler = ListHandler()
+        hopfield_network.logger.addHandler(handler)
+        try:
+            v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+            v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+            network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey")
+            network.asynchronous_recall([1, 1, -1, -1, -1, -1, -1, -1, 1])
+            self.assertEqual(records, [])
+
+            hopfield_network.logger.setLevel(logging.DEBUG)
+            network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey")
+            network.asynchronous_recall([1, 1, -1, -1, -1, -1, -1, -1, 1])
+            self.assertTrue(records[0].startswith("Adding Exemplar"))
+            self.assertTrue("Using asynchronous recall." in records)
+        finally:
+            hopfield_network.logger.removeHandler(handler)
+            hopfield_network.logger.setLevel(logging.NOTSET)
+
+    def test_trace(self):
+        """
+        A trace sink records the training and recall events as integers
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        trace = TraceBuffer()
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey", trace=trace)
+        npt.assert_equal(trace.events, [[recall_trace.EXEMPLAR_ADDED, 0, 0], [recall_trace.EXEMPLAR_ADDED, 1, 0]])
+
+        trace.clear()
+        v_p = [1, 1, -1, -1, -1, -1, -1, -1, 1]
+        results = network.asynchronous_recall(v_p, return_history=True)
+        events = trace.events
+        self.assertEqual(events.dtype, np.int64)
+        sweeps = events[events[:, 0] == recall_trace.SWEEP]
+        npt.assert_equal(sweeps[:, 1], range(len(results)))
+        flips = events[events[:, 0] == recall_trace.FLIP]
+        self.assertEqual(len(flips), sweeps[:, 2].sum())
+        self.assertEqual(len(flips), np.sum(np.array(v_p) != results[0]) + np.sum(results[1:] != results[:-1]))
+
+        trace.clear()
+        results = network.synchronous_recall(v_p, return_history=True)
+        npt.assert_equal(trace.events[:, 0], recall_trace.ITERATION)
+        self.assertEqual(trace.events[0, 2], np.sum(np.array(v_p) != results[0]))
+
+        network.trace = None
+        network.synchronous_recall(v_p)
+        self.assertEqual(len(trace), len(results))
+
+    def test_stats(self):
+        """
+        Stats count the work done by training and recall, once attached to a network
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        v_p = [1, 1, -1, -1, -1, -1, -1, -1, 1]
+        stats = NetworkStats()
+        trace = TraceBuffer()
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey", stats=stats, trace=trace)
+        self.assertTrue(network.stats is stats)
+        self.assertEqual(stats.exemplars_trained, 2)
+        self.assertTrue(TRAINING in stats.phase_times)
+
+        history = network.synchronous_recall(v_p, return_history=True)
+        self.assertEqual(stats.recalls, 1)
+        self.assertEqual(stats.iterations, len(history))
+        self.assertEqual(stats.matvecs, len(history))
+        self.assertTrue(stats.bytes_allocated >= history.nbytes)
+        self.assertTrue(SYNCHRONOUS_RECALL in stats.phase_times)
+
+        stats.reset()
+        trace.clear()
+        history = network.asynchronous_recall(v_p, return_history=True)
+        self.assertEqual(stats.sweeps, len(history))
+        self.assertEqual(stats.flips, np.sum(trace.events[:, 0] == recall_trace.FLIP))
+        self.assertEqual(stats.matvecs, 1)
+        self.assertTrue(ASYNCHRONOUS_RECALL in stats.phase_times)
+
+        stats.reset()
+        states, sweeps, converged = network.asynchronous_recall_batch([v_p, v_one, v_two])
+        self.assertEqual(stats.recalls, 3)
+        self.assertEqual(stats.sweeps, sweeps.sum())
+        self.assertEqual(stats.flips, np.sum(trace.events[:, 0] == recall_trace.FLIP))
+        states, iterations, converged = network.synchronous_recall_batch([v_p, v_one, v_two])
+        self.assertEqual(stats.recalls, 6)
+        self.assertEqual(stats.iterations, iterations.sum())
+        self.assertTrue(BATCH_RECALL in stats.phase_times)
+
+        # Chunked Hebbian training times the whole of training
+        chunked_stats = NetworkStats()
+        start = network_stats.clock()
+        HopfieldNetwork([v_one, v_two, v_p], chunk_size=2, stats=chunked_stats)
+        self.assertEqual(chunked_stats.exemplars_trained, 3)
+        self.assertTrue(0 <= chunked_stats.phase_times[TRAINING] <= network_stats.clock() - start)
+
+        # Detached stats are left alone
+        network.stats = None
+        counts = stats.to_dict()
+        network.synchronous_recall(v_p)
+        network.add_exemplars([[1, 1, 1, 1, 1, 1, 1, 1, 1]])
+        self.assertEqual(stats.to_dict(), counts)
+
+    def test_recall_cache(self):
+        """
+        Repeated deterministic recalls are answered from the cache until the weights change
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        v_p = [1, 1, -1, -1, -1, -1, -1, -1, 1]
+        stats = NetworkStats()
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey", stats=stats, cache_size=4)
+        cache = network.recall_cache
+
+        expected = network.asynchronous_recall(v_p, return_reason=True)
+        flips = stats.flips
+        self.assertEqual(network.asynchronous_recall(v_p, return_reason=True), expected)
+        self.assertEqual(network.asynchronous_recall(np.array(v_p)), expected[0])
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(stats.flips, flips)
+        self.assertEqual(stats.recalls, 3)
+
+        # Returned results can be modified without changing the cache
+        network.asynchronous_recall(v_p)[0][0] = 0
+        self.assertEqual(network.asynchronous_recall(v_p), expected[0])
+
+        # Seeded random schedules are cached, unseeded ones and those returning history are not
+        seeded = network.asynchronous_recall(v_p, schedule=PERMUTATION, random_state=1)
+        self.assertEqual(network.asynchronous_recall(v_p, schedule=PERMUTATION, random_state=1), seeded)
+        network.asynchronous_recall(v_p, schedule=RANDOM)
+        network.asynchronous_recall(v_p, return_history=True)
+        self.assertEqual(len(cache), 2)
+
+        # Changing the weights empties the cache
+        network.add_exemplars([[1, 1, 1, 1, 1, 1, 1, 1, 1]])
+        self.assertEqual(len(cache), 0)
+        network.asynchronous_recall(v_p)
+        self.assertEqual(len(cache), 1)
+        network.forget_exemplars([[1, 1, 1, 1, 1, 1, 1, 1, 1]])
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(network.asynchronous_recall(v_p, return_reason=True), expected)
+
+        # A detached cache is left alone
+        network.recall_cache = None
+        network.asynchronous_recall(v_p, schedule=PERMUTATION, random_state=2)
+        self.assertEqual(len(cache), 1)
+
+    def test_attractor_index(self):
+        """
+        Recall stops at known attractors and reports which one it reached
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        v_p = [1, 1, -1, -1, -1, -1, -1, -1, 1]
+        plain = HopfieldNetwork([v_one, v_two], learning_rule="Storkey")
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey", attractor_index=True)
+        with self.assertRaises(ValueError):
+            plain.asynchronous_recall(v_p, return_attractor=True)
+
+        expected = plain.asynchronous_recall(v_p, return_history=True)
+        history, reason, attractor = network.asynchronous_recall(v_p, return_reason=True, return_history=True,
+                                                                 return_attractor=True)
+        self.assertEqual(reason, CONVERGED)
+        self.assertEqual(attractor, (EXEMPLAR, 0))
+        npt.assert_equal(history[-1], v_one)
+        self.assertEqual(len(history), len(expected) - 1)
+        self.assertEqual(network.find_attractor(v_two), (EXEMPLAR, 1))
+
+        # Fixed points which are not exemplars are indexed as spurious attractors as they are found
+        rng = np.random.RandomState(0)
+        spurious = None
+        for probe in rng.choice([-1, 1], size=(50, 9)):
+            results, attractor = network.asynchronous_recall(probe, return_attractor=True)
+            state = results[0]
+            self.assertEqual(state, plain.asynchronous_recall(probe)[0])
+            if attractor[0] == SPURIOUS:
+                spurious = state
+        self.assertTrue(spurious is not None)
+        self.assertEqual(network.find_attractor(spurious)[0], SPURIOUS)
+
+        # Reaching a known attractor converges without a confirming sweep
+        _, reason, attractor = network.asynchronous_recall(v_p, max_sweeps=1, return_reason=True,
+                                                           return_attractor=True)
+        self.assertEqual(reason, CONVERGED)
+        self.assertEqual(attractor, (EXEMPLAR, 0))
+        _, reason = plain.asynchronous_recall(v_p, max_sweeps=1, return_reason=True)
+        self.assertEqual(reason, MAX_ITERATIONS)
+
+        # Changing the weights forgets the attractors
+        network.add_exemplars([[1, 1, 1, 1, 1, 1, 1, 1, 1]])
+        self.assertTrue(network.find_attractor(spurious) is None)
+        self.assertEqual(network.find_attractor([1, 1, 1, 1, 1, 1, 1, 1, 1]), (EXEMPLAR, 2))
+
+    def test_stable_patterns(self):
+        """
+        A pattern is stable exactly when asynchronous recall from it returns it unchanged
+        """
+        rng = np.random.RandomState(3)
+        for learning_rule, storage in [("Hebb", None), ("Hebb", SCALED), ("Hebb", OVERLAP), ("Storkey", None)]:
+            exemplars = rng.choice([-1, 1], size=(6, 12))
+            kwargs = {} if storage is None else {'storage': storage}
+            network = HopfieldNetwork(exemplars.tolist(), learning_rule=learning_rule, **kwargs)
+            patterns = np.vstack([exemplars, rng.choice([-1, 1], size=(10, 12))])
+
+            stable, stable_bits, margins = network.stable_patterns(patterns)
+            self.assertEqual(stable_bits.shape, patterns.shape)
+            npt.assert_equal(stable, np.all(stable_bits, axis=1))
+            npt.assert_allclose(margins, patterns * network.weight_matrix.dot(patterns.T).T, atol=1e-12)
+            self.assertTrue(np.all(margins[~stable_bits] <= 0))
+            for pattern, pattern_stable in zip(patterns, stable):
+                self.assertEqual(network.asynchronous_recall(pattern)[0] == pattern.tolist(), pattern_stable)
+
+        # A flipped bit of a stable exemplar has a negative margin
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey")
+        stable, stable_bits, margins = network.stable_patterns([v_one, [-1] + v_one[1:]])
+        npt.assert_equal(stable, [True, False])
+        self.assertTrue(margins[1, 0] < 0)
+
+    def test_asynchronous_recall_max_sweeps(self):
+        """
+        Asynchronous recall stops after max_sweeps sweeps
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Hebb")
+        v_p = [1, 1, -1, -1, -1, -1, -1, -1, 1]
+
+        results, reason = network.asynchronous_recall(v_p, max_sweeps=1, return_reason=True, return_history=True)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(reason, MAX_ITERATIONS)
+
+        results, reason = network.asynchronous_recall(v_p, return_reason=True)
+        self.assertEqual(results[-1], v_one)
+        self.assertEqual(reason, CONVERGED)
+
+    def test_energy(self):
+        """
+        The energy of a state is -1/2 x^T W x, and the batched form agrees with it
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Hebb")
+        v_p = [1, 1, -1, -1, -1, -1, -1, -1, 1]
+
+        self.assertAlmostEqual(network.energy(v_one), -0.5 * np.dot(v_one, np.dot(network.weight_matrix, v_one)))
+        self.assertTrue(network.energy(v_one) < network.energy(v_p))
+        npt.assert_almost_equal(network.energy_batch([v_one, v_two, v_p]),
+                                [network.energy(v_one), network.energy(v_two), network.energy(v_p)])
+
+    def test_recall_energy_trace(self):
+        """
+        Recall records the energy after each step, and can stop once the energy can no longer decrease
+        """
+        v_one = [1, -1, -1, -1, 1, -1, -1, -1, 1]
+        v_two = [-1, -1, -1, 1, 1, 1, -1, -1, -1]
+        network = HopfieldNetwork([v_one, v_two], learning_rule="Hebb")
+        v_p = [1, 1, -1, -1, -1, -1, -1, -1, 1]
+
+        results, energies = network.asynchronous_recall(v_p, return_energy=True, return_history=True)
+        self.assertEqual(len(energies), len(results))
+        npt.assert_almost_equal(energies, [network.energy(result) for result in results])
+        self.assertTrue(np.all(np.diff(energies) <= 0))
+
+        # The sweep confirming the final state is skipped
+        early, reason = network.asynchronous_recall(v_p, stop_on_energy=True, return_reason=True,
+                                                    return_history=True)
+        npt.assert_equal(early, results[:-1])
+        self.assertEqual(reason, CONVERGED)
+
+        results, reason, energies = network.synchronous_recall(v_one, return_reason=True, return_energy=True)
+        npt.assert_almost_equal(energies, [network.energy(v_one)])
+        early, reason = network.synchronous_recall(v_two, stop_on_energy=True, return_reason=True)
+        self.assertEqual(early, [v_two])
+        self.assertEqual(reason, CONVERGED)
+
+    def test_save_load(self):
+        """
+        A saved network loads with the same weights, memory-mapped by default, and recalls the same states
+        """
+        random.seed(1234)
+        v_exemplars = [[random.choice([-1, 1]) for _ in range(40)] for _ in range(4)]
+        v_p = list(v_exemplars[0])
+        v_p[:5] = [-x for x in v_p[:5]]
+        path = tempfile.mkdtemp()
+        try:
+            for learning_rule, storage in [("Hebb", "dense"), ("Hebb", FLOAT32), ("Hebb", SCALED), ("Hebb", PACKED),
+                                           ("Hebb", OVERLAP), ("Storkey", "dense")]:
+                network = HopfieldNetwork(v_exemplars, learning_rule=learning_rule, storage=storage)
+                directory = os.path.join(path, learning_rule + storage)
+                network.save(directory)
+
+                loaded = HopfieldNetwork.load(directory)
+                self.assertEqual(loaded.learning_rule, learning_rule)
+                self.assertEqual(loaded.storage, storage)
+                self.assertEqual(loaded.num_neurons, 40)
+                self.assertEqual(loaded.num_exemplars, 4)
+                self.assertEqual(loaded.capacity, network.capacity)
+                npt.assert_equal(loaded.weight_matrix, network.weight_matrix)
+                npt.assert_equal(loaded.synchronous_recall(v_p), network.synchronous_recall(v_p))
+                npt.assert_equal(loaded.asynchronous_recall(v_p), network.asynchronous_recall(v_p))
+
+                loaded = HopfieldNetwork.load(directory, mmap=False)
+                npt.assert_equal(loaded.weight_matrix, network.weight_matrix)
+
+            # OVERLAP weights are the exemplars, saved once as int8
+            directory = os.path.join(path, 'Hebb' + OVERLAP)
+            self.assertFalse(os.path.exists(os.path.join(directory, 'exemplars.npy')))
+            self.assertEqual(np.load(os.path.join(directory, 'weights_exemplars.npy')).dtype, np.int8)
+            network = HopfieldNetwork(v_exemplars, storage=OVERLAP)
+            network.save(directory, exemplars=False)
+            loaded = HopfieldNetwork.load(directory)
+            self.assertTrue(loaded.has_exemplars)
+            loaded.add_exemplars([v_p])
+            self.assertEqual(loaded.num_exemplars, 5)
+
+            # A memory-mapped network can be saved over the directory it was loaded from
+            for storage in ["dense", OVERLAP]:
+                directory = os.path.join(path, 'Hebb' + storage)
+                network = HopfieldNetwork(v_exemplars, storage=storage)
+                loaded = HopfieldNetwork.load(directory)
+                loaded.save(directory)
+                npt.assert_equal(loaded.weight_matrix, network.weight_matrix)
+                reloaded = HopfieldNetwork.load(directory)
+                npt.assert_equal(reloaded.weight_matrix, network.weight_matrix)
+                self.assertEqual(reloaded.num_exemplars, 4)
+                self.assertFalse([filename for filename in os.listdir(directory) if filename.startswith('.')])
+
+            # Exemplars are optional
+            network = HopfieldNetwork(v_exemplars)
+            network.save(os.path.join(path, 'mmap'), exemplars=False)
+            loaded = HopfieldNetwork.load(os.path.join(path, 'mmap'))
+            self.assertFalse(loaded.has_exemplars)
+            self.assertEqual(loaded.num_exemplars, 4)
+            npt.assert_equal(loaded.synchronous_recall(v_p), network.synchronous_recall(v_p))
+            npt.assert_equal(loaded.stable_patterns(v_exemplars)[0], network.stable_patterns(v_exemplars)[0])
+
+            # but what needs them fails clearly
+            with self.assertRaises(ValueError):
+                loaded.packed_recall(bipolar.pack([v_p]))
+            with self.assertRaises(ValueError):
+                loaded.add_exemplars([v_p])
+            with self.assertRaises(ValueError):
+                loaded.forget_exemplars([v_exemplars[0]])
+            loaded.attractor_index = AttractorIndex()
+            with self.assertRaises(ValueError):
+                loaded.asynchronous_recall(v_p)
+            self.assertEqual(loaded.num_exemplars, 4)
+        finally:
+            shutil.rmtree(path)
+
     # Start of tests for Storkey Learning Rule
 
     def test_init_storkey(self):
@@ -161,6 +834,37 @@ class TestHopfieldNetwork(unittest.TestCase):
         network = HopfieldNetwork([v_one, v_two], learning_rule="Storkey")
         npt.assert_almost_equal(network.weight_matrix, expected_weights)
 
+    def test_init_storkey_matches_reference(self):
+        """
+        The vectorized Storkey training matches the element-by-element rule
+        """
+        random.seed(1234)
+        v_exemplars = [[random.choice([-1, 1]) for _ in range(12)] for _ in range(5)]
+        network = HopfieldNetwork(v_exemplars, learning_rule="Storkey")
+        npt.assert_almost_equal(network.weight_matrix, storkey_reference(v_exemplars))
+
+    def test_add_forget_exemplars_storkey(self):
+        """
+        Exemplars added or forgotten under the Storkey rule give the weights of training on the resulting exemplars
+        """
+        random_state = np.random.RandomState(22)
+        v_exemplars = np.where(random_state.rand(6, 20) < .5, 1, -1).tolist()
+        for checkpoints in [False, True]:
+            network = HopfieldNetwork(v_exemplars[:3], learning_rule="Storkey", checkpoints=checkpoints)
+            network.add_exemplars(v_exemplars[3:])
+            npt.assert_almost_equal(network.weight_matrix,
+                                    HopfieldNetwork(v_exemplars, learning_rule="Storkey").weight_matrix)
+
+            network.forget_exemplars([v_exemplars[4], v_exemplars[1]])
+            remaining = [v_exemplars[0], v_exemplars[2], v_exemplars[3], v_exemplars[5]]
+            self.assertEqual(network.num_exemplars, 4)
+            npt.assert_almost_equal(network.weight_matrix,
+                                    HopfieldNetwork(remaining, learning_rule="Storkey").weight_matrix)
+
+            network.forget_exemplars([v_exemplars[5]])
+            npt.assert_almost_equal(network.weight_matrix,
+                                    HopfieldNetwork(remaining[:3], learning_rule="Storkey").weight_matrix)
+
     def test_perfect_recall_storkey(self):
         """
         Recall an original exemplar using the actual original exemplar (no noise) in a network
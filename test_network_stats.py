@@ -0,0 +1,49 @@
+import pickle
+import unittest
+
+from network_stats import NetworkStats, TRAINING
+
+
+class TestNetworkStats(unittest.TestCase):
+    """
+    Test the counters of the work done by a network
+    """
+
+    def test_reset(self):
+        stats = NetworkStats()
+        stats.flips += 3
+        stats.add_time(TRAINING, .5)
+        stats.add_time(TRAINING, .25)
+        self.assertEqual(stats.phase_times, {TRAINING: .75})
+
+        stats.reset()
+        self.assertEqual(stats.flips, 0)
+        self.assertEqual(stats.phase_times, {})
+
+    def test_merge(self):
+        a = NetworkStats()
+        a.sweeps = 2
+        a.add_time(TRAINING, 1.0)
+        b = NetworkStats()
+        b.sweeps = 3
+        b.recalls = 1
+        b.add_time('asynchronous_recall', 2.0)
+
+        total = a + b
+        self.assertEqual(total.sweeps, 5)
+        self.assertEqual(total.recalls, 1)
+        self.assertEqual(total.phase_times, {TRAINING: 1.0, 'asynchronous_recall': 2.0})
+        self.assertEqual(a.sweeps, 2)
+
+        self.assertEqual(sum([a, b, b]).sweeps, 8)
+
+        # Stats sent from other processes as dicts or pickles
+        a.merge(b.to_dict())
+        a.merge(pickle.loads(pickle.dumps(b)))
+        self.assertEqual(a.sweeps, 8)
+        self.assertEqual(NetworkStats.from_dict(a.to_dict()).to_dict(), a.to_dict())
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestNetworkStats)
+    unittest.TextTestRunner(verbosity=2).run(suite)
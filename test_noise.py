@@ -0,0 +1,44 @@
+import numpy as np
+import numpy.testing as npt
+import unittest
+
+from exemplars import Exemplars
+from lippmann_exemplars import LippmanExemplars
+from noise import add_noise_batch
+
+
+class TestNoise(unittest.TestCase):
+    """
+    Test vectorized noise injection
+    """
+
+    def test_add_noise_batch(self):
+        exemplar = Exemplars.get_exemplars()[0]
+        noisy = add_noise_batch(exemplar, p=.25, count=2000, random_state=1234)
+        self.assertEqual(noisy.shape, (2000, 100))
+        self.assertEqual(noisy.dtype, np.int8)
+        self.assertTrue(np.all(np.abs(noisy) == 1))
+        self.assertAlmostEqual(np.mean(noisy != exemplar), .25, places=2)
+
+        # Seeded noise is reproducible
+        npt.assert_equal(add_noise_batch(exemplar, p=.25, count=2000, random_state=1234), noisy)
+
+        npt.assert_equal(add_noise_batch(exemplar, p=0, count=3), [exemplar] * 3)
+        npt.assert_equal(add_noise_batch(exemplar, p=1, count=3), [[-x for x in exemplar]] * 3)
+
+    def test_add_noise_batch_hamming(self):
+        exemplar = LippmanExemplars.get_exemplars()[0]
+        for hamming in [0, 1, 30, 119, 120]:
+            noisy = LippmanExemplars.add_noise_batch(exemplar, count=50, random_state=np.random.RandomState(7),
+                                                     hamming=hamming)
+            self.assertEqual(noisy.shape, (50, 120))
+            npt.assert_equal(np.sum(noisy != exemplar, axis=1), hamming)
+
+        # Every value is equally likely to be flipped
+        noisy = add_noise_batch(exemplar, count=4000, random_state=7, hamming=30)
+        self.assertTrue(np.all(np.abs(np.mean(noisy != exemplar, axis=0) - .25) < .04))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestNoise)
+    unittest.TextTestRunner(verbosity=2).run(suite)
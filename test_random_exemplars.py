@@ -1,3 +1,6 @@
+import numpy as np
+import numpy.testing as npt
+import random
 import unittest
 
 from random_exemplars import RandomExemplars
@@ -15,6 +18,46 @@ class TestRandomExemplars(unittest.TestCase):
         self.assertTrue(exemplars[2] == [1, -1, -1, -1])
         self.assertTrue(exemplars[3] == [1, 1, -1, -1])
 
+    def test_generate_exemplars_randomize(self):
+        random.seed(1234)
+        exemplars = RandomExemplars.get_exemplars(10, 6, randomize=True)
+        random.seed(1234)
+        samples = random.sample(range(0, 2 ** 10), 6)
+        self.assertEqual(exemplars, [[1 if (sample >> (9 - i)) & 1 else -1 for i in range(10)] for sample in samples])
+
+        # Lengths beyond the range of xrange
+        exemplars = RandomExemplars.get_exemplars(80, 5, randomize=True)
+        self.assertEqual(len(set(map(tuple, exemplars))), 5)
+        self.assertTrue(all(len(exemplar) == 80 for exemplar in exemplars))
+
+    def test_generate_exemplars_randomize_long(self):
+        # Every element of exemplars longer than the 53 bits of random() is drawn uniformly
+        random.seed(60)
+        for length in [53, 54, 60, 62, 63]:
+            exemplars = np.array(RandomExemplars.get_exemplars(length, length, randomize=True))
+            self.assertEqual(exemplars.shape, (length, length))
+            self.assertFalse(np.any(np.all(exemplars == exemplars[0], axis=0)))
+
+    def test_generate(self):
+        # Every bipolar vector of length 3
+        exemplars = RandomExemplars.generate(3, 8, random_state=1234)
+        self.assertEqual(exemplars.shape, (8, 3))
+        self.assertEqual(exemplars.dtype, np.int8)
+        self.assertEqual(len(set(map(tuple, exemplars))), 8)
+        self.assertTrue(np.all(np.abs(exemplars) == 1))
+
+        exemplars = RandomExemplars.generate(1000, 20, random_state=1234)
+        self.assertEqual(exemplars.shape, (20, 1000))
+        self.assertAlmostEqual(np.mean(exemplars == 1), .5, places=1)
+        npt.assert_equal(RandomExemplars.generate(1000, 20, random_state=1234), exemplars)
+
+    def test_generate_batches(self):
+        batches = list(RandomExemplars.generate_batches(5, 30, 8, random_state=np.random.RandomState(99)))
+        self.assertEqual([len(batch) for batch in batches], [8, 8, 8, 6])
+
+        # Exemplars are distinct across batches
+        self.assertEqual(len(set(map(tuple, np.concatenate(batches)))), 30)
+
 
 if __name__ == '__main__':
     suite = unittest.TestLoader().loadTestsFromTestCase(TestRandomExemplars)
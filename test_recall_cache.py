@@ -0,0 +1,41 @@
+import unittest
+
+from recall_cache import RecallCache
+
+
+class TestRecallCache(unittest.TestCase):
+    """
+    Test the cache of recall results
+    """
+
+    def test_get_put(self):
+        cache = RecallCache(2)
+        self.assertTrue(cache.get('a') is None)
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache.reset_stats()
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def test_evicts_least_recently_used(self):
+        cache = RecallCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+
+        # Using 'a' leaves 'b' as the least recently used result
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(cache.get('b') is None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 3)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestRecallCache)
+    unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from results_store import ResultsStore
+
+
+class TestResultsStore(unittest.TestCase):
+    """
+    Test the append-only experiment results store
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'results.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_add_reload(self):
+        records = [{'n': 5, 'k': k, 'trial': 0, 'learning_rule': 'Hebb', 'seed': 0, 'error_rate': .5}
+                   for k in range(1, 5)]
+        with ResultsStore(self.path, batch_size=3) as store:
+            for record in records:
+                store.add(record)
+
+            # Records are written in batches
+            with open(self.path) as records_file:
+                self.assertEqual(len(records_file.readlines()), 3)
+            self.assertEqual(len(store), 4)
+            self.assertTrue((5, 4, 0, 'Hebb', 0) in store)
+
+        store = ResultsStore(self.path)
+        self.assertEqual(store.records, records)
+        self.assertTrue((5, 1, 0, 'Hebb', 0) in store)
+        self.assertFalse((5, 1, 0, 'Storkey', 0) in store)
+        self.assertFalse((5, 1, 1, 'Hebb', 0) in store)
+
+    def test_partial_record(self):
+        """
+        A record left partially written by an interrupted write is skipped, and later records are still readable
+        """
+        with open(self.path, 'w') as records_file:
+            records_file.write('{"k": 1, "n": 5}\n{"k": 2, "n"')
+
+        with ResultsStore(self.path, key_fields=('n', 'k')) as store:
+            self.assertEqual(store.records, [{'n': 5, 'k': 1}])
+            store.add({'n': 5, 'k': 2})
+
+        store = ResultsStore(self.path, key_fields=('n', 'k'))
+        self.assertEqual(store.records, [{'n': 5, 'k': 1}, {'n': 5, 'k': 2}])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestResultsStore)
+    unittest.TextTestRunner(verbosity=2).run(suite)
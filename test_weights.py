@@ -0,0 +1,96 @@
+import numpy as np
+import numpy.testing as npt
+import os
+import shutil
+import tempfile
+import unittest
+
+import weights
+
+
+class TestWeights(unittest.TestCase):
+    """
+    Test that every weight storage computes the same local fields as the weight matrix
+    """
+
+    def setUp(self):
+        random_state = np.random.RandomState(3)
+        self.exemplars = np.where(random_state.rand(4, 25) < .5, 1, -1)
+        self.counts = np.dot(self.exemplars.T, self.exemplars).astype(np.float64)
+        np.fill_diagonal(self.counts, 0)
+        self.matrix = self.counts / 25
+        self.states = np.where(random_state.rand(6, 25) < .5, 1.0, -1.0)
+
+    def check_storage(self, storage, decimal=7):
+        npt.assert_almost_equal(storage.to_dense(), self.matrix, decimal=decimal)
+        npt.assert_almost_equal(storage.dot(self.states), np.dot(self.states, self.matrix), decimal=decimal)
+        for x_s in self.states:
+            npt.assert_almost_equal(storage.dot(x_s), np.dot(self.matrix, x_s), decimal=decimal)
+            for i in [0, 7, 24]:
+                npt.assert_almost_equal(storage.column(i), self.matrix[:, i], decimal=decimal)
+                self.assertAlmostEqual(storage.row_dot(i, x_s), np.dot(self.matrix[i], x_s), places=decimal)
+
+    def test_dense(self):
+        self.check_storage(weights.from_matrix(self.matrix))
+        self.check_storage(weights.from_matrix(self.matrix, dtype=np.float32), decimal=5)
+
+    def test_scaled_integer(self):
+        storage = weights.ScaledIntegerWeights(self.counts, 25)
+        self.assertEqual(storage.dtype, np.int16)
+        self.check_storage(storage)
+
+    def test_packed_symmetric(self):
+        storage = weights.from_matrix(self.matrix, symmetric=True)
+        self.assertEqual(storage.nbytes, 8 * (25 * 24 / 2 + 26))
+        self.check_storage(storage)
+
+    def test_pattern_overlap(self):
+        storage = weights.PatternOverlapWeights(self.exemplars)
+        self.assertEqual(storage.nbytes, 4 * 25)
+        self.check_storage(storage)
+
+        # Products taken over several blocks of neurons
+        storage.BLOCK_SIZE = 7
+        self.check_storage(storage)
+        npt.assert_almost_equal(storage.tracker(self.states[0].copy()).fields, np.dot(self.matrix, self.states[0]))
+
+    def test_pattern_overlap_many_exemplars(self):
+        # Overlaps of more exemplars than int8 can count are accumulated without overflow
+        exemplars = np.where(np.random.RandomState(4).rand(300, 25) < .5, 1, -1)
+        matrix = np.dot(exemplars.T, exemplars).astype(np.float64)
+        np.fill_diagonal(matrix, 0)
+        matrix /= 25
+        storage = weights.PatternOverlapWeights(exemplars)
+        npt.assert_almost_equal(storage.to_dense(), matrix)
+        npt.assert_almost_equal(storage.dot(self.states), np.dot(self.states, matrix))
+        npt.assert_almost_equal(storage.column(7), matrix[:, 7])
+        self.assertAlmostEqual(storage.row_dot(7, self.states[0].astype(np.int8)), np.dot(matrix[7], self.states[0]))
+
+    def test_pattern_overlap_memory_mapped(self):
+        # Memory-mapped exemplars are used in place rather than copied
+        path = tempfile.mkdtemp()
+        try:
+            np.save(os.path.join(path, 'exemplars.npy'), self.exemplars.astype(np.int8))
+            exemplars = np.load(os.path.join(path, 'exemplars.npy'), mmap_mode='r')
+            storage = weights.PatternOverlapWeights(exemplars)
+            self.assertTrue(np.may_share_memory(storage.exemplars, exemplars))
+            self.assertTrue(np.may_share_memory(storage.neuron_exemplars, exemplars))
+            self.assertEqual(storage.nbytes, exemplars.nbytes)
+            self.check_storage(storage)
+            del storage, exemplars
+        finally:
+            shutil.rmtree(path)
+
+    def test_trackers(self):
+        for storage in [weights.from_matrix(self.matrix), weights.PatternOverlapWeights(self.exemplars)]:
+            x_s = self.states[0].copy()
+            tracker = storage.tracker(x_s)
+            for i in [3, 9, 3, 20]:
+                tracker.flip(i, -x_s[i])
+                npt.assert_almost_equal(tracker.fields, np.dot(self.matrix, x_s))
+                self.assertAlmostEqual(tracker.field(5), np.dot(self.matrix[5], x_s))
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestWeights)
+    unittest.TextTestRunner(verbosity=2).run(suite)
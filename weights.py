@@ -0,0 +1,522 @@
+import numpy as np
+
+# Local fields smaller than this are recomputed directly before applying the hard limiter
+FIELD_TOLERANCE = 1e-9
+
+
+def from_matrix(matrix, dtype=np.float64, symmetric=False):
+    """
+    Store a weight matrix
+    :param matrix: the n x n float64 weight matrix
+    :param dtype: floating point type to store the weights as
+    :param symmetric: store only the upper triangle of the (symmetric) matrix
+    :return: DenseWeights or PackedSymmetricWeights
+    """
+    if symmetric:
+        return PackedSymmetricWeights.from_matrix(matrix, dtype)
+    return DenseWeights(np.asarray(matrix, dtype=dtype))
+
+
+class DenseWeights(object):
+    """
+    Weight matrix of a Hopfield network stored as a dense n x n array, of float64 or float32.  Local fields are
+    computed in the precision of the matrix.
+    """
+
+    def __init__(self, matrix):
+        """
+        :param matrix: the n x n weight matrix
+        """
+        self.__matrix = matrix
+
+    @property
+    def num_neurons(self):
+        return self.__matrix.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.__matrix.nbytes
+
+    @property
+    def dtype(self):
+        return self.__matrix.dtype
+
+    @property
+    def arrays(self):
+        return {'matrix': self.__matrix}
+
+    def to_dense(self):
+        """
+        :return: the n x n weight matrix
+        """
+        return self.__matrix
+
+    def dot(self, x_s, out=None):
+        """
+        Compute the local fields Wx of a state, or of each row of a (b, n) array of states
+        :param x_s: (n,) state or (b, n) array of states
+        :param out: optional float64 array to write the fields to
+        :return: the local fields, with the same shape as x_s
+        """
+        x_s = np.asarray(x_s, dtype=self.__matrix.dtype)
+        if self.__matrix.dtype == np.float64:
+            if x_s.ndim == 1:
+                return np.dot(self.__matrix, x_s, out=out)
+            return np.dot(x_s, self.__matrix.T, out=out)
+
+        fields = np.dot(self.__matrix, x_s) if x_s.ndim == 1 else np.dot(x_s, self.__matrix.T)
+        if out is None:
+            return fields.astype(np.float64)
+        out[...] = fields
+        return out
+
+    def row_dot(self, i, x_s):
+        """
+        Compute the local field of neuron i directly
+        :param i: neuron index
+        :param x_s: state
+        :return: (Wx)_i
+        """
+        return np.dot(self.__matrix[i].astype(np.float64), x_s)
+
+    def column(self, i):
+        """
+        :param i: neuron index
+        :return: column i of the weight matrix, as a float64 array
+        """
+        return self.__matrix[:, i].astype(np.float64, copy=False)
+
+    def tracker(self, x_s):
+        """
+        Start tracking the local fields of a state that is updated one neuron at a time
+        :param x_s: float64 state vector, which the tracker updates in place
+        :return: a FieldTracker
+        """
+        return FieldTracker(self, x_s)
+
+
+class ScaledIntegerWeights(object):
+    """
+    Weight matrix of a Hopfield network trained with the Hebbian learning rule, stored exactly as the integer matrix
+    nW = X^T X - kI in int16 (or int32 when more than 32767 exemplars are stored).  Local fields are computed
+    exactly in blocks of rows converted to float64, then divided by n.
+    """
+
+    # Rows of the integer matrix converted to float64 at a time
+    BLOCK_SIZE = 256
+
+    def __init__(self, counts, divisor):
+        """
+        :param counts: the n x n integer-valued matrix nW.  An int16 or int32 array is stored as is.
+        :param divisor: n, the divisor taking the integer matrix to W
+        """
+        counts = np.asarray(counts)
+        if counts.dtype not in (np.int16, np.int32):
+            limit = np.abs(counts).max() if counts.size else 0
+            dtype = np.int16 if limit <= np.iinfo(np.int16).max else np.int32
+            counts = np.rint(counts).astype(dtype)
+        self.__counts = counts
+        self.__divisor = divisor
+
+    @property
+    def num_neurons(self):
+        return self.__counts.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.__counts.nbytes
+
+    @property
+    def dtype(self):
+        return self.__counts.dtype
+
+    @property
+    def arrays(self):
+        return {'counts': self.__counts}
+
+    def to_dense(self):
+        """
+        :return: the n x n weight matrix, as float64
+        """
+        return self.__counts / float(self.__divisor)
+
+    def dot(self, x_s, out=None):
+        """
+        Compute the local fields Wx of a state, or of each row of a (b, n) array of states
+        :param x_s: (n,) state or (b, n) array of states
+        :param out: optional float64 array to write the fields to
+        :return: the local fields, with the same shape as x_s
+        """
+        x_s = np.asarray(x_s, dtype=np.float64)
+        fields = np.empty(x_s.shape) if out is None else out
+        for start in range(0, self.num_neurons, self.BLOCK_SIZE):
+            rows = self.__counts[start:start + self.BLOCK_SIZE].astype(np.float64)
+            if x_s.ndim == 1:
+                fields[start:start + self.BLOCK_SIZE] = np.dot(rows, x_s)
+            else:
+                fields[:, start:start + self.BLOCK_SIZE] = np.dot(x_s, rows.T)
+        fields /= self.__divisor
+        return fields
+
+    def row_dot(self, i, x_s):
+        """
+        Compute the local field of neuron i directly
+        :param i: neuron index
+        :param x_s: state
+        :return: (Wx)_i
+        """
+        return np.dot(self.__counts[i].astype(np.float64), x_s) / self.__divisor
+
+    def column(self, i):
+        """
+        :param i: neuron index
+        :return: column i of the weight matrix, as a float64 array
+        """
+        return self.__counts[:, i] / float(self.__divisor)
+
+    def tracker(self, x_s):
+        """
+        Start tracking the local fields of a state that is updated one neuron at a time
+        :param x_s: float64 state vector, which the tracker updates in place
+        :return: a FieldTracker
+        """
+        return FieldTracker(self, x_s)
+
+
+class PackedSymmetricWeights(object):
+    """
+    Symmetric weight matrix of a Hopfield network with a zero diagonal, storing only the n(n - 1)/2 weights above the
+    diagonal, row by row.  The weight matrices of the Hebbian and Storkey learning rules are both symmetric.
+    """
+
+    def __init__(self, packed):
+        """
+        :param packed: the n(n - 1)/2 weights above the diagonal, row by row
+        """
+        n = int(round((1 + np.sqrt(1 + 8 * len(packed))) / 2))
+        assert(n * (n - 1) // 2 == len(packed))
+
+        # Offset of the start of each row, with row i holding w_i,i+1 ... w_i,n-1
+        lengths = np.arange(n - 1, -1, -1)
+        self.__offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self.__weights = packed
+
+    @classmethod
+    def from_matrix(cls, matrix, dtype=np.float64):
+        """
+        Pack the upper triangle of a weight matrix
+        :param matrix: the n x n weight matrix
+        :param dtype: floating point type to store the weights as
+        :return: PackedSymmetricWeights
+        """
+        n = matrix.shape[0]
+        packed = np.empty(n * (n - 1) // 2, dtype=dtype)
+        start = 0
+        for i in range(n):
+            packed[start:start + n - 1 - i] = matrix[i, i + 1:]
+            start += n - 1 - i
+        return cls(packed)
+
+    @property
+    def num_neurons(self):
+        return len(self.__offsets) - 1
+
+    @property
+    def nbytes(self):
+        return self.__weights.nbytes + self.__offsets.nbytes
+
+    @property
+    def dtype(self):
+        return self.__weights.dtype
+
+    @property
+    def arrays(self):
+        return {'packed': self.__weights}
+
+    def __row(self, i):
+        """
+        :return: the weights above the diagonal in row i
+        """
+        return self.__weights[self.__offsets[i]:self.__offsets[i + 1]]
+
+    def to_dense(self):
+        """
+        :return: the n x n weight matrix, as float64
+        """
+        n = self.num_neurons
+        matrix = np.zeros(shape=(n, n))
+        for i in range(n):
+            matrix[i, i + 1:] = self.__row(i)
+            matrix[i + 1:, i] = self.__row(i)
+        return matrix
+
+    def dot(self, x_s, out=None):
+        """
+        Compute the local fields Wx of a state, or of each row of a (b, n) array of states
+        :param x_s: (n,) state or (b, n) array of states
+        :param out: optional float64 array to write the fields to
+        :return: the local fields, with the same shape as x_s
+        """
+        x_s = np.asarray(x_s, dtype=np.float64)
+        fields = np.zeros(x_s.shape) if out is None else out
+        fields[...] = 0
+        for i in range(self.num_neurons - 1):
+            row = self.__row(i)
+            if x_s.ndim == 1:
+                fields[i] += np.dot(row, x_s[i + 1:])
+                fields[i + 1:] += x_s[i] * row
+            else:
+                fields[:, i] += np.dot(x_s[:, i + 1:], row)
+                fields[:, i + 1:] += np.outer(x_s[:, i], row)
+        return fields
+
+    def row_dot(self, i, x_s):
+        """
+        Compute the local field of neuron i directly
+        :param i: neuron index
+        :param x_s: state
+        :return: (Wx)_i
+        """
+        return np.dot(self.column(i), x_s)
+
+    def column(self, i):
+        """
+        :param i: neuron index
+        :return: column i of the weight matrix, as a float64 array
+        """
+        column = np.empty(self.num_neurons)
+        column[:i] = self.__weights[self.__offsets[:i] + (i - 1 - np.arange(i))]
+        column[i] = 0
+        column[i + 1:] = self.__row(i)
+        return column
+
+    def tracker(self, x_s):
+        """
+        Start tracking the local fields of a state that is updated one neuron at a time
+        :param x_s: float64 state vector, which the tracker updates in place
+        :return: a FieldTracker
+        """
+        return FieldTracker(self, x_s)
+
+
+class PatternOverlapWeights(object):
+    """
+    Implicit weight matrix of a Hopfield network trained with the Hebbian learning rule.  W = (X^T X - kI) / n for
+    the (k, n) exemplar matrix X, so only X is stored and the local fields are computed from the overlaps of a
+    state with the exemplars as (X^T (Xx) - kx) / n.  Memory is O(kn) rather than O(n^2), as is the cost of
+    computing the fields.  X is kept as int8, and products with it are computed in blocks of neurons converted to
+    float64, so the overlaps are accumulated without overflow and without a float64 copy of X.
+    """
+
+    # Neurons of the exemplar matrix converted to float64 at a time
+    BLOCK_SIZE = 1024
+
+    def __init__(self, exemplars):
+        """
+        :param exemplars: (k, n) array of bipolar exemplars
+        """
+        self.__exemplars = np.asarray(exemplars, dtype=np.int8)
+
+        # Exemplar values for each neuron, as a view so that memory-mapped exemplars are not copied
+        self.__neuron_exemplars = self.__exemplars.T
+
+    @property
+    def num_neurons(self):
+        return self.__exemplars.shape[1]
+
+    @property
+    def num_exemplars(self):
+        return self.__exemplars.shape[0]
+
+    @property
+    def exemplars(self):
+        return self.__exemplars
+
+    @property
+    def neuron_exemplars(self):
+        return self.__neuron_exemplars
+
+    @property
+    def arrays(self):
+        return {'exemplars': self.__exemplars}
+
+    @property
+    def nbytes(self):
+        return self.__exemplars.nbytes
+
+    def to_dense(self):
+        """
+        :return: the n x n weight matrix, materialised from the exemplars
+        """
+        exemplars = self.__exemplars.astype(np.float64)
+        matrix = np.dot(exemplars.T, exemplars)
+        np.fill_diagonal(matrix, 0)
+        matrix /= self.num_neurons
+        return matrix
+
+    def overlaps(self, x_s):
+        """
+        Compute the overlaps Xx of a state with the exemplars, or of each row of a (b, n) array of states
+        :param x_s: (n,) state or (b, n) array of states
+        :return: (k,) or (b, k) float64 array of overlaps
+        """
+        x_s = np.asarray(x_s, dtype=np.float64)
+        overlaps = np.zeros(x_s.shape[:-1] + (self.num_exemplars,))
+        for start in range(0, self.num_neurons, self.BLOCK_SIZE):
+            block = self.__exemplars[:, start:start + self.BLOCK_SIZE].astype(np.float64)
+            overlaps += np.dot(x_s[..., start:start + self.BLOCK_SIZE], block.T)
+        return overlaps
+
+    def expand(self, overlaps, out=None):
+        """
+        Compute X^T m for overlaps m, or for each row of a (b, k) array of overlaps
+        :param overlaps: (k,) or (b, k) overlaps
+        :param out: optional float64 array to write the result to
+        :return: (n,) or (b, n) float64 array
+        """
+        overlaps = np.asarray(overlaps, dtype=np.float64)
+        result = np.empty(overlaps.shape[:-1] + (self.num_neurons,)) if out is None else out
+        for start in range(0, self.num_neurons, self.BLOCK_SIZE):
+            block = self.__exemplars[:, start:start + self.BLOCK_SIZE].astype(np.float64)
+            result[..., start:start + self.BLOCK_SIZE] = np.dot(overlaps, block)
+        return result
+
+    def fields(self, overlaps, x_s, out=None):
+        """
+        Compute the local fields Wx of a state from its overlaps with the exemplars
+        :param overlaps: overlaps Xx from overlaps()
+        :param x_s: (n,) state or (b, n) array of states
+        :param out: optional float64 array to write the fields to
+        :return: the local fields, with the same shape as x_s
+        """
+        fields = self.expand(overlaps, out)
+        fields -= self.num_exemplars * np.asarray(x_s, dtype=np.float64)
+        fields /= self.num_neurons
+        return fields
+
+    def dot(self, x_s, out=None):
+        """
+        Compute the local fields Wx of a state, or of each row of a (b, n) array of states
+        :param x_s: (n,) state or (b, n) array of states
+        :param out: optional float64 array to write the fields to
+        :return: the local fields, with the same shape as x_s
+        """
+        return self.fields(self.overlaps(x_s), x_s, out)
+
+    def row_dot(self, i, x_s):
+        """
+        Compute the local field of neuron i directly
+        :param i: neuron index
+        :param x_s: state
+        :return: (Wx)_i
+        """
+        x_s = np.asarray(x_s, dtype=np.float64)
+        overlaps = self.overlaps(x_s)
+        return ((np.dot(self.__neuron_exemplars[i].astype(np.float64), overlaps) - self.num_exemplars * x_s[i]) /
+                self.num_neurons)
+
+    def column(self, i):
+        """
+        :param i: neuron index
+        :return: column i of the weight matrix, as a float64 array
+        """
+        column = self.expand(self.__neuron_exemplars[i])
+        column[i] = 0
+        column /= self.num_neurons
+        return column
+
+    def tracker(self, x_s):
+        """
+        Start tracking the local fields of a state that is updated one neuron at a time
+        :param x_s: float64 state vector, which the tracker updates in place
+        :return: an OverlapTracker
+        """
+        return OverlapTracker(self, x_s)
+
+
+class FieldTracker(object):
+    """
+    Keeps the local fields h = Wx of a state up to date as single neurons flip.  Each flip of neuron i costs one
+    column of W.
+    """
+
+    def __init__(self, weights, x_s):
+        """
+        :param weights: the weights of the network
+        :param x_s: float64 state vector, updated in place by flip
+        """
+        self.__weights = weights
+        self.x_s = x_s
+        self.fields = weights.dot(x_s)
+
+    def field(self, i):
+        """
+        :param i: neuron index
+        :return: the local field of neuron i
+        """
+        h_i = self.fields[i]
+
+        # Near-ties are decided by the direct product so round-off accumulated in the incremental updates cannot
+        # change the outcome of the hard limiter.
+        if abs(h_i) < FIELD_TOLERANCE:
+            h_i = self.__weights.row_dot(i, self.x_s)
+        return h_i
+
+    def flip(self, i, x_i):
+        """
+        Set neuron i to x_i and update the local fields
+        :param i: neuron index
+        :param x_i: new value of the neuron
+        """
+        self.fields += (x_i - self.x_s[i]) * self.__weights.column(i)
+        self.x_s[i] = x_i
+
+    def refresh(self):
+        """
+        Recompute the local fields from scratch, discarding accumulated round-off
+        """
+        self.fields = self.__weights.dot(self.x_s)
+
+
+class OverlapTracker(object):
+    """
+    Keeps the overlaps m = Xx of a state with the exemplars up to date as single neurons flip, for weights stored as
+    PatternOverlapWeights.  The field of a single neuron and each flip cost O(k).
+    """
+
+    def __init__(self, weights, x_s):
+        """
+        :param weights: the PatternOverlapWeights of the network
+        :param x_s: float64 state vector, updated in place by flip
+        """
+        self.__weights = weights
+        self.__neuron_exemplars = weights.neuron_exemplars
+        self.__overlaps = weights.overlaps(x_s)
+        self.x_s = x_s
+
+    @property
+    def fields(self):
+        return self.__weights.fields(self.__overlaps, self.x_s)
+
+    def field(self, i):
+        """
+        :param i: neuron index
+        :return: the local field of neuron i
+        """
+        return ((np.dot(self.__neuron_exemplars[i], self.__overlaps) - self.__weights.num_exemplars * self.x_s[i]) /
+                self.__weights.num_neurons)
+
+    def flip(self, i, x_i):
+        """
+        Set neuron i to x_i and update the overlaps
+        :param i: neuron index
+        :param x_i: new value of the neuron
+        """
+        self.__overlaps += (x_i - self.x_s[i]) * self.__neuron_exemplars[i]
+        self.x_s[i] = x_i
+
+    def refresh(self):
+        """
+        Recompute the overlaps from scratch
+        """
+        self.__overlaps = self.__weights.overlaps(self.x_s)